@@ -1,6 +1,8 @@
 import json
 import os.path
 
+from utils.paths import get_base_directory
+
 
 class ConfigManager:
     __instance = None
@@ -33,11 +35,7 @@ class ConfigManager:
 
     @staticmethod
     def deduct_path() -> str:
-        parent_directory = os.path.dirname(os.path.abspath(__file__))
-        base_directory = os.path.dirname(parent_directory)
-
-        new_path = os.path.join(base_directory, 'config.json')
-        return new_path
+        return os.path.join(get_base_directory(), 'config.json')
 
     def read(self) -> dict:
         with open(self.path, 'r', encoding='utf-8') as file:
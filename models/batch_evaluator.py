@@ -0,0 +1,93 @@
+import numpy as np
+
+from models.catalog import Catalog
+
+
+class BatchEvaluator:
+    """
+    Rates many solutions (as 2-D array of group positions, see Catalog) at once with NumPy.
+    Per group and day class it keeps the first start, the last start and the end of the last started meeting,
+    so spans of a day are reductions over courses, overlaps are sums of precomputed conflict counts.
+    Results are the same as CourseManager.rate_solution gives.
+    """
+    chunk_size: int = 1024  # rows evaluated at once, limits memory of (rows, courses, day classes) arrays
+    no_start: int = np.iinfo(np.int64).max
+
+    def __init__(self, catalog: Catalog):
+        self.catalog: Catalog = catalog
+        courses_count = len(catalog.group_slots)
+        max_groups = max((len(course_slots) for course_slots in catalog.group_slots), default=0)
+        classes_count = len(catalog.day_class_weights)
+        self.weights: np.ndarray = np.array(catalog.day_class_weights, dtype=np.int64)
+        self.travel_minutes: np.ndarray = np.array(catalog.travel_minutes, dtype=np.int64)
+        self.end_base: int = max((end for course_slots in catalog.group_slots for group_slots in course_slots
+                                  for _, slots in group_slots for _, end in slots), default=0) + 1
+
+        # course index, group position, day class -> first start of the group, no_start if group has no meetings
+        self.first_starts: np.ndarray = np.full((courses_count, max_groups, classes_count), self.no_start, np.int64)
+        # the same for (last start * number of courses + course index) * end_base + end of the last started meeting,
+        # maximum over courses gives the meeting that is last after stable sorting by start, -1 if no meetings
+        self.last_keys: np.ndarray = np.full((courses_count, max_groups, classes_count), -1, np.int64)
+        for course_index, course_slots in enumerate(catalog.group_slots):
+            for position, group_slots in enumerate(course_slots):
+                for day_class, slots in group_slots:
+                    day_spans = {}
+                    catalog.extend_span(day_spans, day_class, slots)
+                    first_start, last_start, last_end = day_spans[day_class]
+                    self.first_starts[course_index, position, day_class] = first_start
+                    self.last_keys[course_index, position, day_class] = (
+                            (last_start * courses_count + course_index) * self.end_base + last_end)
+
+        # (course index, other course index, day classes, group position -> other group position -> day class
+        # -> number of overlapping pairs of meetings), day classes are only those with any overlaps
+        self.conflicts: list[tuple[int, int, np.ndarray, np.ndarray]] = []
+        for (course_index, other_course_index), course_conflicts in catalog.conflicts.items():
+            day_classes = sorted({day_class for counts in course_conflicts.values() for day_class in counts})
+            class_positions = {day_class: i for i, day_class in enumerate(day_classes)}
+            counts_array = np.zeros((len(catalog.group_slots[course_index]),
+                                     len(catalog.group_slots[other_course_index]), len(day_classes)), np.int64)
+            for (position, other_position), counts in course_conflicts.items():
+                for day_class, count in counts.items():
+                    counts_array[position, other_position, class_positions[day_class]] = count
+            self.conflicts.append((course_index, other_course_index, np.array(day_classes, np.int64), counts_array))
+
+    def rate_positions(self, positions: np.ndarray) -> np.ndarray:
+        """Returns fitness (0 for solutions with more than one overlap) of every row of group positions"""
+        positions = np.asarray(positions, dtype=np.int64)
+        fitness = np.empty(len(positions), dtype=np.float64)
+        for start in range(0, len(positions), self.chunk_size):
+            fitness[start:start + self.chunk_size] = self.rate_chunk(positions[start:start + self.chunk_size])
+        return fitness
+
+    def rate_chunk(self, positions: np.ndarray) -> np.ndarray:
+        courses_count = positions.shape[1]
+        course_indices = np.arange(courses_count)
+
+        first_starts = self.first_starts[course_indices, positions].min(axis=1)
+        last_ends = self.last_keys[course_indices, positions].max(axis=1) % self.end_base
+        has_meetings = first_starts != self.no_start
+        first_starts = np.where(has_meetings, first_starts, 0)
+        last_ends = np.where(has_meetings, last_ends, 0)
+        day_minutes = (last_ends - first_starts + self.travel_minutes[first_starts // 60] +
+                       self.travel_minutes[last_ends // 60 % 24])
+        total_minutes = np.where(has_meetings, day_minutes, 0) @ self.weights
+
+        infeasible = self.get_overlaps(positions) > self.catalog.max_overlaps
+        if np.any(total_minutes[~infeasible] == 0):
+            raise ZeroDivisionError("Solution without any meetings")
+        return np.where(infeasible, 0.0, 1.0 / np.where(infeasible, 1, total_minutes))
+
+    def get_overlaps(self, positions: np.ndarray) -> np.ndarray:
+        """Same as Catalog.count_overlaps, meetings are compared only for rows lookups can not decide"""
+        conflicts = np.zeros((len(positions), len(self.weights)), dtype=np.int64)
+        for course_index, other_course_index, day_classes, counts in self.conflicts:
+            conflicts[:, day_classes] += counts[positions[:, course_index], positions[:, other_course_index]]
+        overlapping_pairs = conflicts @ self.weights
+        overlapping_days = (conflicts > 0) @ self.weights
+
+        overlaps = np.where(overlapping_pairs <= 1, overlapping_pairs, 2)
+        for row in np.flatnonzero((overlapping_pairs > 1) & (overlapping_days <= 1)):
+            row_conflicts = {int(day_class): int(conflicts[row, day_class])
+                             for day_class in np.flatnonzero(conflicts[row])}
+            overlaps[row] = self.catalog.count_overlaps(row_conflicts, positions[row].tolist())
+        return overlaps
@@ -0,0 +1,220 @@
+from models.course import Course
+from models.meeting import Meeting
+
+
+class Catalog:
+    """
+    Read-only index of loaded courses used by optimizers.
+    Courses are addressed by their index in the course list, groups by group id (or position within the course).
+
+    Meetings are also compressed into day classes - days on which every group has exactly the same meetings
+    (e.g. all Mondays of a weekly schedule, except holidays) are evaluated once and weighted by their count.
+    Each group is stored as its slots in the day classes it takes part in, so regular weekly meetings end up
+    in one heavily weighted class and exceptions (moved or cancelled classes) in separate ones.
+    """
+
+    def __init__(self, courses: list[Course], travel_minutes: list[int] = None, max_overlaps: int = 1):
+        if max_overlaps not in (0, 1):
+            raise ValueError(f"Unsupported number of allowed overlaps {max_overlaps}")
+        self.courses: list[Course] = courses
+        self.max_overlaps: int = max_overlaps  # solutions with more overlaps are infeasible (fitness 0)
+        self.travel_minutes: list[int] = travel_minutes or [0] * 24  # hour -> travel time in minutes
+        self.group_ids: list[list[int]] = [course.get_group_ids() for course in courses]
+        self.group_id_sets: list[frozenset[int]] = [frozenset(group_ids) for group_ids in self.group_ids]
+        # course index -> group id -> position of the group in group_ids
+        self.group_positions: list[dict[int, int]] = [
+            {group_id: position for position, group_id in enumerate(group_ids)} for group_ids in self.group_ids]
+        # course index -> group id -> meetings
+        self.meetings: list[dict[int, list[Meeting]]] = [
+            {group['group_id']: group['meetings'] for group in course.groups} for course in courses]
+
+        self.day_class_weights: list[int] = []  # day class -> number of days in the class
+        # course index -> group position -> ((day class, ((start, end), ...)), ...)
+        self.group_slots: list[list[tuple[tuple[int, tuple[tuple[int, int], ...]], ...]]] = []
+        self.compress_days()
+        # (course index, other course index) -> (group position, other group position) -> day class -> number of
+        # overlapping pairs of meetings, course pairs without any overlapping groups are not stored
+        self.conflicts: dict[tuple[int, int], dict[tuple[int, int], dict[int, int]]] = {}
+        self.find_conflicts()
+        # course index -> course pairs from conflicts that contain the course
+        self.course_conflicts: list[list[tuple[int, int]]] = [[] for _ in courses]
+        for course_pair in self.conflicts:
+            self.course_conflicts[course_pair[0]].append(course_pair)
+            if course_pair[1] != course_pair[0]:
+                self.course_conflicts[course_pair[1]].append(course_pair)
+
+    def compress_days(self) -> None:
+        """
+        Days share a class only if every group of every course has the same meetings on them, because university
+        time of a day spans meetings of all chosen groups together and cannot be split per course.
+        Limitation: a biweekly group splits the weeks it meets in from the others, so each parity (and each
+        combination of parities of biweekly groups on the same weekday) is a separate class, as is every day
+        with an exception. Terms with many biweekly groups compress only a few times, not by an order of magnitude.
+        """
+        # day -> group -> (start, end) of its meetings on this day, in course and meeting order
+        days: dict[int, dict[tuple[int, int], list[tuple[int, int]]]] = {}
+        for course_index, group_ids in enumerate(self.group_ids):
+            for position, group_id in enumerate(group_ids):
+                for meet in self.meetings[course_index][group_id]:
+                    day_groups = days.setdefault(meet.day, {})
+                    day_groups.setdefault((course_index, position), []).append((meet.start, meet.end))
+
+        day_classes: dict[tuple, int] = {}  # day signature -> day class
+        group_slots: dict[tuple[int, int], list[tuple[int, tuple[tuple[int, int], ...]]]] = {}
+        for day in sorted(days):
+            signature = tuple((group, tuple(slots)) for group, slots in days[day].items())
+            if signature in day_classes:
+                self.day_class_weights[day_classes[signature]] += 1
+                continue
+            day_classes[signature] = day_class = len(self.day_class_weights)
+            self.day_class_weights.append(1)
+            for group, slots in signature:
+                group_slots.setdefault(group, []).append((day_class, slots))
+
+        self.group_slots = [[tuple(group_slots.get((course_index, position), ())) for position in range(len(group_ids))]
+                            for course_index, group_ids in enumerate(self.group_ids)]
+
+    def find_conflicts(self) -> None:
+        """Finds overlapping meetings of every pair of groups (and meetings of a single group) in every day class"""
+        # day class -> (start, end, course index, group position) of all meetings
+        class_slots: dict[int, list[tuple[int, int, int, int]]] = {}
+        for course_index, course_slots in enumerate(self.group_slots):
+            for position, group_slots in enumerate(course_slots):
+                for day_class, slots in group_slots:
+                    class_slots.setdefault(day_class, []).extend(
+                        (start, end, course_index, position) for start, end in slots)
+        for day_class, slots in class_slots.items():
+            slots.sort(key=lambda slot: slot[0])
+            for i, (start, end, course_index, position) in enumerate(slots):
+                for j in range(i + 1, len(slots)):  # no slicing, day classes can have many meetings
+                    other_start, _, other_course_index, other_position = slots[j]
+                    if other_start > end:
+                        break
+                    if course_index == other_course_index and position != other_position:
+                        continue  # groups of the same course are never chosen together
+                    key = min((course_index, position), (other_course_index, other_position))
+                    other_key = max((course_index, position), (other_course_index, other_position))
+                    counts = self.conflicts.setdefault((key[0], other_key[0]), {}).setdefault(
+                        (key[1], other_key[1]), {})
+                    counts[day_class] = counts.get(day_class, 0) + 1
+
+    def get_course_components(self) -> list[list[int]]:
+        """
+        Returns connected components (lists of course indices) of the graph of courses with groups meeting
+        on the same day. Courses of different components never share a day, so total university time
+        and overlaps of a solution are sums over components.
+        """
+        day_courses: dict[int, list[int]] = {}  # day class -> courses with any meetings in it
+        for course_index, course_slots in enumerate(self.group_slots):
+            for day_class in {day_class for group_slots in course_slots for day_class, _ in group_slots}:
+                day_courses.setdefault(day_class, []).append(course_index)
+        parents = list(range(len(self.group_slots)))
+
+        def find(course_index: int) -> int:
+            while parents[course_index] != course_index:
+                parents[course_index] = course_index = parents[parents[course_index]]
+            return course_index
+
+        for course_indices in day_courses.values():
+            for course_index in course_indices[1:]:
+                parents[find(course_index)] = find(course_indices[0])
+        components: dict[int, list[int]] = {}
+        for course_index in range(len(parents)):
+            components.setdefault(find(course_index), []).append(course_index)
+        return list(components.values())
+
+    def get_conflicts(self, positions: list[int]) -> dict[int, int]:
+        """Returns day class -> number of pairs of overlapping meetings (not weighted) for given group positions"""
+        conflicts = {}
+        for (course_index, other_course_index), course_conflicts in self.conflicts.items():
+            counts = course_conflicts.get((positions[course_index], positions[other_course_index]))
+            if counts:
+                for day_class, count in counts.items():
+                    conflicts[day_class] = conflicts.get(day_class, 0) + count
+        return conflicts
+
+    def get_group_conflicts(self, course_index: int, position: int, positions: list[int]) -> dict[int, int]:
+        """
+        Returns day class -> number of pairs of overlapping meetings (not weighted) of given group
+        with itself and with groups of other courses at given positions
+        """
+        conflicts = {}
+        for course_pair in self.course_conflicts[course_index]:
+            if course_pair[0] == course_index:
+                key = (position, position if course_pair[1] == course_index else positions[course_pair[1]])
+            else:
+                key = (positions[course_pair[0]], position)
+            counts = self.conflicts[course_pair].get(key)
+            if counts:
+                for day_class, count in counts.items():
+                    conflicts[day_class] = conflicts.get(day_class, 0) + count
+        return conflicts
+
+    def get_overlaps(self, positions: list[int]) -> int:
+        return self.count_overlaps(self.get_conflicts(positions), positions)
+
+    def count_overlaps(self, conflicts: dict[int, int], positions: list[int]) -> int:
+        """
+        Returns number of overlaps for given conflicts of groups at given positions, same as
+        TimeTable.check_for_overlaps counts them (consecutive meetings of a day), but exact only up to 2 -
+        enough for the "at most one overlap" rule (and for max_overlaps 0).
+        If meetings overlap on a day, some consecutive meetings of the day overlap as well, so consecutive overlaps
+        are between the number of days with overlapping meetings and the number of overlapping pairs.
+        Meetings are compared only if the lookups can not decide.
+        """
+        conflicts = {day_class: count for day_class, count in conflicts.items() if count}
+        if not conflicts:
+            return 0
+        if sum(self.day_class_weights[day_class] * count for day_class, count in conflicts.items()) <= 1:
+            return 1
+        if sum(self.day_class_weights[day_class] for day_class in conflicts) > 1:
+            return 2
+        day_class, = conflicts  # single day with many overlapping pairs
+        slots = sorted((slot for course_slots, position in zip(self.group_slots, positions)
+                        for slot_class, day_slots in course_slots[position] if slot_class == day_class
+                        for slot in day_slots), key=lambda slot: slot[0])
+        return sum(slots[i + 1][0] <= slots[i][1] for i in range(len(slots) - 1))
+
+    def get_total_minutes(self, positions: list[int]) -> int:
+        """
+        Returns total university time in minutes (with travel time) for given group positions,
+        same as TimeTable.get_total_university_minutes - from the first start to the end of the last started meeting.
+        """
+        day_spans: dict[int, list[int]] = {}  # day class -> [first start, last start, end of last started meeting]
+        for course_slots, position in zip(self.group_slots, positions):
+            for day_class, slots in course_slots[position]:
+                self.extend_span(day_spans, day_class, slots)
+        return sum(self.get_span_minutes(day_class, span) for day_class, span in day_spans.items())
+
+    @staticmethod
+    def extend_span(day_spans: dict[int, list[int]], day_class: int, slots: tuple[tuple[int, int], ...]) -> None:
+        span = day_spans.get(day_class)
+        for start, end in slots:
+            if span is None:
+                span = day_spans[day_class] = [start, start, end]
+            elif start >= span[1]:  # later meeting starting at the same time is sorted after
+                span[1] = start
+                span[2] = end
+            elif start < span[0]:
+                span[0] = start
+
+    def get_span_minutes(self, day_class: int, span: list[int]) -> int:
+        """Returns weighted time of given day class span with travel time"""
+        first_start, _, last_end = span
+        return self.day_class_weights[day_class] * (last_end - first_start + self.travel_minutes[first_start // 60] +
+                                                    self.travel_minutes[last_end // 60 % 24])
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def get_group_ids(self, course_index: int) -> list[int]:
+        return self.group_ids[course_index]
+
+    def is_valid_group(self, course_index: int, group_id: int) -> bool:
+        return group_id in self.group_id_sets[course_index]
+
+    def get_group_position(self, course_index: int, group_id: int) -> int:
+        return self.group_positions[course_index][group_id]
+
+    def get_meetings(self, course_index: int, group_id: int) -> list[Meeting]:
+        return self.meetings[course_index][group_id]
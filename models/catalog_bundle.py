@@ -0,0 +1,82 @@
+import os
+import pickle
+import struct
+import tempfile
+import time
+
+from models.course import Course
+from utils.paths import get_cache_directory
+
+
+class CatalogEntry:
+    """Courses (one per course unit) scraped for one course id, without groups blacklisted at scraping time"""
+
+    def __init__(self, courses: list[Course], blacklist: dict[str, list[int]], fetched_at: float = None):
+        self.courses: list[Course] = courses
+        self.blacklist: dict[str, list[int]] = blacklist
+        self.fetched_at: float = fetched_at or time.time()
+
+
+class CatalogBundle:
+    """
+    Single binary file with fully parsed courses of one term, stored per course id.
+    File layout: magic, format version, pickled tuple of primitives (no class instances, so the file
+    does not depend on model classes), meeting times are stored the same way as in Meeting.
+    """
+    magic: bytes = b'UTOC'
+    version: int = 4
+    header: struct.Struct = struct.Struct('<4sH')
+    max_age: int = 6 * 60 * 60  # seconds, same as the shortest USOS response cache TTL
+
+    def __init__(self, directory: str = None):
+        self.directory: str = directory or get_cache_directory('catalog')
+
+    def get_path(self, term: str) -> str:
+        return os.path.join(self.directory, f"{term.replace('/', '_')}.bin")
+
+    def save(self, term: str, entries: dict[str, CatalogEntry]) -> None:
+        payload = (term, tuple(
+            (course_id, entry.fetched_at, entry.blacklist, tuple(
+                (course.raw_id, course.main_id, course.name, course.unit_id, course.type, tuple(
+                    (group['group_id'], group['lecturer'],
+                     tuple(meet.day for meet in group['meetings']),
+                     tuple(meet.start for meet in group['meetings']),
+                     tuple(meet.end for meet in group['meetings']))
+                    for group in course.groups))
+                for course in entry.courses))
+            for course_id, entry in entries.items()))
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.get_path(term)
+        # unique temporary file, so concurrent savers (islands, app windows) do not write into the same file
+        with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as file:
+            file.write(self.header.pack(self.magic, self.version))
+            pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, path)
+
+    def load(self, term: str) -> dict[str, CatalogEntry]:
+        """Returns entries of given term that are not older than max_age"""
+        try:
+            with open(self.get_path(term), 'rb') as file:
+                magic, version = self.header.unpack(file.read(self.header.size))
+                if magic != self.magic or version != self.version:
+                    return {}
+                bundle_term, entries_data = pickle.load(file)
+        except (FileNotFoundError, struct.error, pickle.UnpicklingError, EOFError, ValueError):
+            return {}
+        if bundle_term != term:
+            return {}
+
+        entries = {}
+        for course_id, fetched_at, blacklist, courses_data in entries_data:
+            if time.time() - fetched_at > self.max_age:
+                continue
+            courses = []
+            for raw_id, main_id, name, unit_id, course_type, groups in courses_data:
+                course = Course(raw_id, name, course_unit_id=unit_id)
+                course.main_id = main_id
+                course.type = course_type
+                for group_id, lecturer, days, starts, ends in groups:
+                    course.add_parsed_group(group_id, list(zip(days, starts, ends)), lecturer)
+                courses.append(course)
+            entries[course_id] = CatalogEntry(courses, blacklist, fetched_at)
+        return entries
@@ -9,6 +9,7 @@ class Course:
         self.name: str = course_name
         self.unit_id: int = course_unit_id
         self.groups: list[dict[str, any]] = []
+        self.groups_by_id: dict[int, dict[str, any]] = {}
         self.type: str = ""
 
     def update_type(self, new_type: str) -> None:
@@ -17,13 +18,20 @@ class Course:
             self.main_id = f"{self.main_id}_{self.type.replace(' ', '_')}"
 
     def blacklist_group(self, group_id: int) -> None:
-        for group in self.groups:
-            if group['group_id'] == group_id:
-                self.groups.remove(group)
-                return
+        if (group := self.groups_by_id.pop(group_id, None)) is not None:
+            self.groups.remove(group)
         else:
             print(f"Group {group_id} not found in {self.name}")
 
+    def copy(self) -> 'Course':
+        """Shallow copy - groups can be removed from the copy without affecting this course"""
+        course = Course(self.raw_id, self.name, self.unit_id)
+        course.main_id = self.main_id
+        course.type = self.type
+        course.groups = self.groups.copy()
+        course.groups_by_id = self.groups_by_id.copy()
+        return course
+
     def __str__(self) -> str:
         return f"{self.name} {self.main_id} {self.unit_id} {self.type} {self.groups}"
 
@@ -31,15 +39,21 @@ class Course:
         return f"Course(course_id={self.main_id}, course_name={self.name}, course_unit_id={self.unit_id}, groups={self.groups})"
 
     def add_group(self, group_id: int, meetings: list[dict[str, str]], lecturer: str, lesson_type: str) -> None:
-        self.groups.append(dict(group_id=group_id, lecturer=lecturer, meetings=
-        [Meeting(start_time=meet["start_time"], end_time=meet["end_time"], lecturer=lecturer,
-                 group_id=group_id, parent=self) for meet in meetings]))
+        self.add_parsed_group(group_id, [Meeting.parse_times(meet["start_time"], meet["end_time"])
+                                         for meet in meetings], lecturer)
+
+    def add_parsed_group(self, group_id: int, meeting_times: list[tuple[int, int, int]], lecturer: str) -> None:
+        """meeting_times - (day, start minute, end minute) of each meeting, see Meeting"""
+        group = dict(group_id=group_id, lecturer=lecturer, meetings=
+        [Meeting(day=day, start=start, end=end, lecturer=lecturer,
+                 group_id=group_id, parent=self) for day, start, end in meeting_times])
+        self.groups.append(group)
+        self.groups_by_id[group_id] = group
 
     def get_group_ids(self) -> list[int]:
         return [group['group_id'] for group in self.groups]
 
     def get_all_meetings_for_group(self, group_id: int) -> list[Meeting]:
-        for group in self.groups:
-            if group['group_id'] == group_id:
-                return group['meetings']
+        if (group := self.groups_by_id.get(group_id)) is not None:
+            return group['meetings']
         return []
@@ -1,34 +1,126 @@
+import copy
 import math
 
+import numpy as np
+
 from config.config_manager import ConfigManager
+from models.batch_evaluator import BatchEvaluator
+from models.catalog import Catalog
+from models.catalog_bundle import CatalogBundle, CatalogEntry
 from models.course import Course
+from models.parallel_evaluator import ParallelEvaluator
+from models.solution_state import SolutionState
 from models.timetable import TimeTable
+from utils.fitness_cache import FitnessCache
 from utils.scraper import Scraper
 
 
 class CourseManager:
-    def __init__(self):
+    def __init__(self, fitness_cache_size: int = 200_000, fitness_cache_policy: str = 'lru',
+                 courses: list[Course] = None):
+        """Courses are loaded according to config, unless already loaded courses are given (e.g. to subprocesses)"""
         self.scraper: Scraper = Scraper()
         self.config: ConfigManager = ConfigManager()
+        self.bundle: CatalogBundle = CatalogBundle()
+        self.catalog_entries: dict[tuple[str, str], CatalogEntry] = {}  # (term, course id) -> scraped courses
         self.courses: list[Course] = []
+        self.catalog: Catalog = Catalog([])
+        self.batch_evaluator: BatchEvaluator = BatchEvaluator(self.catalog)
+        # course index -> sorted group ids and their positions, to map arrays of group ids to positions
+        self.sorted_group_ids: list[tuple[np.ndarray, np.ndarray]] = []
         self.course_groups_dict: dict[str, list[int]] = {}
-        self.load_courses()
-        self.fitness_cache: dict[tuple, float] = {}
-        self.cache_hits: int = 0
+        self.fitness_cache: FitnessCache = FitnessCache(fitness_cache_size, fitness_cache_policy)
+        if courses is None:
+            self.load_courses()
+        else:
+            self.set_courses(courses)
+
+    @property
+    def cache_hits(self) -> int:
+        return self.fitness_cache.hits
 
     def load_courses(self) -> None:
+        """
+        Synchronizes catalog bundle on disk with config - only added (or outdated) courses are scraped,
+        removed courses are dropped and newly blacklisted groups are removed locally.
+        Courses are scraped again only if some of the groups skipped during scraping are no longer blacklisted.
+        """
+        term = self.config.get_term()
+        course_ids = self.config.get_all_courses()
+        self.catalog_entries = {(term, course_id): entry for course_id, entry in self.bundle.load(term).items()}
+
+        removed_keys = [key for key in self.catalog_entries if key[1] not in course_ids]
+        for key in removed_keys:
+            del self.catalog_entries[key]
+        missing_course_ids = [
+            course_id for course_id in course_ids if (term, course_id) not in self.catalog_entries or
+            not self.is_blacklist_covered(self.catalog_entries[(term, course_id)].blacklist,
+                                          self.config.get_blacklisted_groups_for_course(course_id) or {})]
+        if missing_course_ids:
+            self.scrape_courses(term, missing_course_ids)
+        if missing_course_ids or removed_keys:
+            self.bundle.save(term, {course_id: entry for (_, course_id), entry in self.catalog_entries.items()})
+
+        self.set_courses([course for course_id in course_ids for course in self.blacklist_courses(term, course_id)
+                          if course.groups])
+
+    def set_courses(self, courses: list[Course], max_overlaps: int = 1) -> None:
+        """Builds catalog and evaluators of courses, solutions with more overlaps than max_overlaps are infeasible"""
+        self.courses = courses
+        self.catalog = Catalog(self.courses, TimeTable().travel_minutes, max_overlaps)
+        self.batch_evaluator = BatchEvaluator(self.catalog)
+        self.sorted_group_ids = []
+        for group_ids in self.catalog.group_ids:
+            order = np.argsort(group_ids)
+            self.sorted_group_ids.append((np.array(group_ids, dtype=np.int64)[order], order))
+        self.course_groups_dict = {course.main_id: group_ids for course, group_ids in
+                                   zip(self.courses, self.catalog.group_ids)}
+        self.fitness_cache.clear()
+
+    def get_course_components(self) -> list[list[int]]:
+        """Returns groups of course indices that can be optimized independently, see Catalog.get_course_components"""
+        return self.catalog.get_course_components()
+
+    def get_component_manager(self, course_indices: list[int], max_overlaps: int = 1) -> 'CourseManager':
+        """
+        Returns course manager of given courses only, with its own catalog and fitness cache.
+        Its solutions are combined back into solutions of all courses by get_solution_from_components.
+        """
+        manager = copy.copy(self)
+        manager.fitness_cache = FitnessCache(self.fitness_cache.max_entries, self.fitness_cache.policy)
+        manager.set_courses([self.courses[course_index] for course_index in course_indices], max_overlaps)
+        return manager
+
+    def get_solution_from_components(self, components: list[list[int]], solutions: list[list[int]]) -> list[int]:
+        solution = [0] * len(self.courses)
+        for course_indices, component_solution in zip(components, solutions):
+            for course_index, group_id in zip(course_indices, component_solution):
+                solution[course_index] = group_id
+        return solution
 
-        for course_id in self.config.get_all_courses():
-            self.courses.extend(self.scraper.get_course_info(course_id))
-        courses_to_remove = []
-        for course in self.courses:
-            if not course.groups:
-                # print("Removing course", course.name, course.main_id, "because it has no groups")
-                courses_to_remove.append(course)
-        for course in courses_to_remove:
-            self.courses.remove(course)
-        self.course_groups_dict = {course.main_id: course.get_group_ids() for course in self.courses}
+    @staticmethod
+    def is_blacklist_covered(scraped_blacklist: dict[str, list[int]], blacklist: dict[str, list[int]]) -> bool:
+        """Checks if all groups skipped during scraping are still blacklisted"""
+        return all(set(groups) <= set(blacklist.get(course_type, []))
+                   for course_type, groups in scraped_blacklist.items())
 
+    def scrape_courses(self, term: str, course_ids: list[str]) -> None:
+        courses = self.scraper.get_courses_info(course_ids)
+        for course_id in course_ids:
+            blacklist = {course_type: list(groups) for course_type, groups in
+                         (self.config.get_blacklisted_groups_for_course(course_id) or {}).items()}
+            self.catalog_entries[(term, course_id)] = CatalogEntry(
+                [course for course in courses if course.raw_id == course_id], blacklist)
+
+    def blacklist_courses(self, term: str, course_id: str) -> list[Course]:
+        """Returns copies of scraped courses without groups blacklisted after scraping"""
+        entry = self.catalog_entries[(term, course_id)]
+        blacklist = self.config.get_blacklisted_groups_for_course(course_id) or {}
+        courses = [course.copy() for course in entry.courses]
+        for course in courses:
+            for group in set(blacklist.get(course.type, [])) - set(entry.blacklist.get(course.type, [])):
+                course.blacklist_group(group)
+        return courses
 
     def get_group_ids_for_course(self, course_id: str) -> list[int]:
         return self.course_groups_dict[course_id]
@@ -39,38 +131,104 @@ class CourseManager:
     def validate_solution(self, solution: list[int]):
         if len(solution) != len(self.courses):
             raise ValueError("Invalid solution length")
-        for course, group_id in zip(self.courses, solution):
-            if group_id not in course.get_group_ids():
+        for course_index, group_id in enumerate(solution):
+            if not self.catalog.is_valid_group(course_index, group_id):
+                course = self.courses[course_index]
                 raise ValueError(f"Invalid group id {group_id} for course {course.name} {course.main_id}")
 
     def rate_solution(self, solution: list[int]) -> float:
         solution_tuple = tuple(solution)
-        if solution_tuple in self.fitness_cache:
-            self.cache_hits += 1
-            return self.fitness_cache[solution_tuple]
-        self.validate_solution(solution)
-        timetable = TimeTable()
-        for course, group_id in zip(self.courses, solution):
-            meets = course.get_all_meetings_for_group(group_id)
-            timetable.add_meetings(meets)
-        timetable.sort_meetings()
-        if timetable.check_for_overlaps():
+        fitness = self.fitness_cache.get(solution_tuple)
+        if fitness is not None:
+            return fitness
+        positions = self.get_positions(solution)
+        if self.catalog.get_overlaps(positions) > self.catalog.max_overlaps:
             # print("Bad solution - overlaps found")
-            return 0
-        total_time = timetable.get_total_university_time()
-        # print(f"Total time for solution is {total_time}")
-        # print(f"Total time for solution is {total_time.total_seconds() / 60}")
-        fitness = 1 / (total_time.total_seconds() / 60)
-        # print(f"Fitness for solution is {fitness}")
-        self.fitness_cache[solution_tuple] = fitness
+            fitness = 0
+        else:
+            total_time = self.catalog.get_total_minutes(positions)
+            # print(f"Total time for solution is {total_time}")
+            fitness = 1 / total_time
+            # print(f"Fitness for solution is {fitness}")
+        self.fitness_cache.put(solution_tuple, fitness)
         return fitness
 
+    def rate_solutions(self, batch) -> np.ndarray:
+        """
+        Rates many solutions at once, batch is 2-D array (or list of solutions) of group ids with one row per solution.
+        Gives the same fitness as rate_solution, but does not use the fitness cache.
+        """
+        return self.batch_evaluator.rate_positions(self.get_positions_array(batch))
+
+    def rate_positions(self, positions: np.ndarray) -> np.ndarray:
+        """Same as rate_solutions, for 2-D array of group positions (see Catalog), positions are not validated"""
+        return self.batch_evaluator.rate_positions(positions)
+
+    def get_parallel_evaluator(self, workers: int = None) -> ParallelEvaluator:
+        """Returns pool of worker processes for current catalog, it has to be closed after use"""
+        return ParallelEvaluator(self.batch_evaluator, workers)
+
+    def rate_positions_parallel(self, positions: np.ndarray, evaluator: ParallelEvaluator) -> np.ndarray:
+        """
+        Same as rate_positions, in worker processes. Duplicate rows are rated once, they are found in bulk
+        by numbering rows in mixed radix of group counts (the fitness cache is not used, per-solution lookups
+        in this process would cost more than rating and cancel out the parallelism).
+        """
+        group_counts = [len(group_ids) for group_ids in self.catalog.group_ids]
+        if math.prod(group_counts) >= 2 ** 63:  # row numbers would overflow
+            return evaluator.rate_positions(positions)
+        multipliers = np.cumprod([1] + group_counts[:-1], dtype=np.int64)
+        _, indices, inverse = np.unique(positions @ multipliers, return_index=True, return_inverse=True)
+        return evaluator.rate_positions(positions[indices])[inverse.reshape(-1)]
+
+    def get_positions_array(self, batch) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.int64)
+        if batch.ndim != 2 or batch.shape[1] != len(self.courses):
+            raise ValueError("Invalid solution length")
+        positions = np.empty_like(batch)
+        for course_index, (sorted_ids, order) in enumerate(self.sorted_group_ids):
+            group_ids = batch[:, course_index]
+            indices = np.minimum(np.searchsorted(sorted_ids, group_ids), len(sorted_ids) - 1)
+            if not np.all(sorted_ids[indices] == group_ids):
+                course = self.courses[course_index]
+                group_id = group_ids[sorted_ids[indices] != group_ids][0]
+                raise ValueError(f"Invalid group id {group_id} for course {course.name} {course.main_id}")
+            positions[:, course_index] = order[indices]
+        return positions
+
+    def get_positions(self, solution: list[int]) -> list[int]:
+        self.validate_solution(solution)
+        return [self.catalog.get_group_position(course_index, group_id)
+                for course_index, group_id in enumerate(solution)]
+
+    def get_solution_state(self, solution: list[int]) -> SolutionState:
+        """Returns state of solution used to rate and apply single gene changes incrementally"""
+        return SolutionState(self.catalog, self.get_positions(solution))
+
+    def get_valid_group_position(self, course_index: int, group_id: int) -> int:
+        if not self.catalog.is_valid_group(course_index, group_id):
+            course = self.courses[course_index]
+            raise ValueError(f"Invalid group id {group_id} for course {course.name} {course.main_id}")
+        return self.catalog.get_group_position(course_index, group_id)
+
+    def rate_solution_change(self, state: SolutionState, course_index: int, group_id: int) -> float:
+        """Returns fitness of solution from given state with group of one course changed, state is not changed"""
+        return state.get_changed_fitness(course_index, self.get_valid_group_position(course_index, group_id))
+
+    def apply_solution_change(self, state: SolutionState, course_index: int, group_id: int) -> None:
+        state.change(course_index, self.get_valid_group_position(course_index, group_id))
+
+    def get_solution_from_state(self, state: SolutionState) -> list[int]:
+        return self.get_solution_from_positions(state.positions)
+
+    def get_solution_from_positions(self, positions: list[int]) -> list[int]:
+        return [group_ids[position] for group_ids, position in zip(self.catalog.group_ids, positions)]
+
     def get_plan_from_solution(self, solution: list[int]) -> TimeTable:
         self.validate_solution(solution)
         timetable = TimeTable()
-        for course, group_id in zip(self.courses, solution):
-            meets = course.get_all_meetings_for_group(group_id)
-            timetable.add_meetings(meets)
+        for course_index, group_id in enumerate(solution):
+            timetable.add_meetings(self.catalog.get_meetings(course_index, group_id))
         timetable.sort_meetings()
         return timetable
 
@@ -82,4 +240,4 @@ class CourseManager:
         return classes_group_dict
 
     def calculate_possible_solutions(self) -> int:
-        return math.prod([len(course.get_group_ids()) for course in self.courses])
+        return math.prod([len(group_ids) for group_ids in self.catalog.group_ids])
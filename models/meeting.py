@@ -1,29 +1,45 @@
-from datetime import datetime, timedelta
+import sys
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 
 class Meeting:
-    def __init__(self, start_time: str, end_time: str, lecturer: str, group_id: int, parent):
-        self.start_time: datetime = self.convert_to_datetime(start_time)
-        self.end_time: datetime = self.convert_to_datetime(end_time)
-        self.course_name: str = parent.name
-        self.lecturer: str = lecturer
+    """
+    Single class meeting, time is stored as day (proleptic Gregorian ordinal, see datetime.toordinal)
+    and start/end in minutes since midnight of that day, datetime objects are created only on demand for UI.
+    """
+    __slots__ = ('day', 'start', 'end', 'course_name', 'lecturer', 'group_id', 'lesson_type')
+
+    def __init__(self, day: int, start: int, end: int, lecturer: str, group_id: int, parent):
+        self.day: int = day
+        self.start: int = start
+        self.end: int = end
+        self.course_name: str = sys.intern(parent.name)
+        self.lecturer: str = sys.intern(lecturer)
         self.group_id: int = group_id
-        self.lesson_type: str = parent.type
-        self.parent: object = parent
+        self.lesson_type: str = sys.intern(parent.type)
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromordinal(self.day) + timedelta(minutes=self.start)
+
+    @property
+    def end_time(self) -> datetime:
+        return datetime.fromordinal(self.day) + timedelta(minutes=self.end)
 
     def get_weekday(self) -> int:
         """Returns 0 for Monday, 1 for Tuesday, etc."""
-        return self.start_time.weekday()
+        return (self.day + 6) % 7  # day 1 (0001-01-01) was Monday
 
     def get_start_time(self) -> str:
-        return self.start_time.strftime("%H:%M")
+        return f"{self.start // 60 % 24:02d}:{self.start % 60:02d}"
 
     def get_end_time(self) -> str:
-        return self.end_time.strftime("%H:%M")
+        return f"{self.end // 60 % 24:02d}:{self.end % 60:02d}"
 
     def get_date_without_time(self) -> datetime:
-        return self.start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        return datetime.fromordinal(self.day)
 
     def get_first_day_of_week(self) -> datetime:
         return self.start_time - timedelta(days=self.get_weekday())
@@ -35,6 +51,27 @@ class Meeting:
     def convert_to_datetime(date: str) -> datetime:
         return datetime.strptime(date, '%Y-%m-%d %H:%M:%S')
 
+    @staticmethod
+    @lru_cache(maxsize=1 << 16)
+    def parse_timestamp(timestamp: str) -> tuple[int, int]:
+        """
+        Converts USOS timestamp ('YYYY-MM-DD HH:MM:SS') to (day, minute of the day).
+        Fixed-format slicing is much faster than strptime and the same timestamps repeat across groups,
+        so results are memoized. Other formats fall back to strptime.
+        """
+        if len(timestamp) == 19 and timestamp[4] == timestamp[7] == '-' and timestamp[10] == ' ':
+            day = date(int(timestamp[:4]), int(timestamp[5:7]), int(timestamp[8:10])).toordinal()
+            return day, int(timestamp[11:13]) * 60 + int(timestamp[14:16])
+        parsed = Meeting.convert_to_datetime(timestamp)
+        return parsed.toordinal(), parsed.hour * 60 + parsed.minute
+
+    @classmethod
+    def parse_times(cls, start_time: str, end_time: str) -> tuple[int, int, int]:
+        """Converts USOS timestamps to (day, start minute, end minute)"""
+        day, start = cls.parse_timestamp(start_time)
+        end_day, end = cls.parse_timestamp(end_time)
+        return day, start, (end_day - day) * 1440 + end
+
     def __str__(self):
         return f"{self.start_time} - {self.end_time} | {self.course_name} | {self.group_id} | {self.lecturer} | {self.lesson_type}"
 
@@ -42,7 +79,8 @@ class Meeting:
         return f"Meeting(start_time={self.start_time}, end_time={self.end_time}, course_name={self.course_name}, group_id={self.group_id}, lecturer={self.lecturer}, lesson_type={self.lesson_type})"
 
     def is_overlapping(self, other: Any) -> bool:
-        return self.start_time <= other.end_time and other.start_time <= self.end_time
+        day_difference = (other.day - self.day) * 1440
+        return self.start <= other.end + day_difference and other.start + day_difference <= self.end
 
     def to_ui_string(self) -> str:
         return (f"Nazwa kursu:\t{self.course_name}\n"
@@ -0,0 +1,69 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+import numpy as np
+
+from models.batch_evaluator import BatchEvaluator
+
+_worker_evaluators: list[BatchEvaluator] = []  # evaluators of the current worker process
+
+
+def _init_worker(evaluators: list[BatchEvaluator]) -> None:
+    global _worker_evaluators
+    _worker_evaluators = evaluators
+
+
+def _rate_positions(evaluator_index: int, positions: np.ndarray) -> np.ndarray:
+    return _worker_evaluators[evaluator_index].rate_positions(positions)
+
+
+class ParallelEvaluator:
+    """
+    Persistent pool of processes rating solutions (as 2-D array of group positions, see Catalog).
+    Every worker gets the read-only catalog (with travel times) once, when the pool starts,
+    later only chunks of positions and fitness values are sent between processes.
+    One pool can serve several catalogs (e.g. components optimized one by one), see get_shared.
+    """
+    min_chunk_size: int = 256  # smaller chunks are not worth sending to another process
+
+    def __init__(self, evaluator: Union[BatchEvaluator, list[BatchEvaluator]], workers: int = None):
+        self.evaluators: list[BatchEvaluator] = evaluator if isinstance(evaluator, list) else [evaluator]
+        self.evaluator_index: int = 0
+        self.evaluator: BatchEvaluator = self.evaluators[0]
+        self.workers: int = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._owner: Optional['ParallelEvaluator'] = None  # evaluator owning the pool, None if this one does
+
+    def get_shared(self, evaluator_index: int) -> 'ParallelEvaluator':
+        """Returns evaluator rating with evaluator of given index in the same pool, closing it keeps the pool running"""
+        shared = copy.copy(self)
+        shared.evaluator_index = evaluator_index
+        shared.evaluator = self.evaluators[evaluator_index]
+        shared._owner = self._owner or self
+        return shared
+
+    def start(self) -> None:
+        if self._owner is not None:
+            self._owner.start()
+            self._executor = self._owner._executor
+        elif self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.evaluators,))
+
+    def rate_positions(self, positions: np.ndarray) -> np.ndarray:
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) < 2 * self.min_chunk_size:
+            return self.evaluator.rate_positions(positions)
+        self.start()
+        chunks_count = min(self.workers, len(positions) // self.min_chunk_size)
+        chunks = np.array_split(positions, chunks_count)
+        return np.concatenate(list(self._executor.map(_rate_positions, [self.evaluator_index] * len(chunks), chunks)))
+
+    def close(self) -> None:
+        if self._owner is not None:
+            self._executor = None  # pool is shut down by its owner
+        elif self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,95 @@
+from models.catalog import Catalog
+
+
+class SolutionState:
+    """
+    Solution (as group positions, see Catalog) with cached per-day state, so fitness after changing
+    a single gene is computed only from the days of the old and the new group.
+    """
+
+    def __init__(self, catalog: Catalog, positions: list[int]):
+        self.catalog: Catalog = catalog
+        self.positions: list[int] = list(positions)
+        # day class -> course index -> slots of the chosen group of the course
+        self.day_groups: dict[int, dict[int, tuple[tuple[int, int], ...]]] = {}
+        for course_index, (course_slots, position) in enumerate(zip(catalog.group_slots, self.positions)):
+            for day_class, slots in course_slots[position]:
+                self.day_groups.setdefault(day_class, {})[course_index] = slots
+        self.day_minutes: dict[int, int] = {day_class: self.get_day_minutes(day_class, groups)
+                                            for day_class, groups in self.day_groups.items()}
+        self.total_minutes: int = sum(self.day_minutes.values())
+        self.conflicts: dict[int, int] = catalog.get_conflicts(self.positions)
+        self.overlaps: int = catalog.count_overlaps(self.conflicts, self.positions)
+
+    def get_day_minutes(self, day_class: int, groups: dict[int, tuple[tuple[int, int], ...]]) -> int:
+        if not groups:
+            return 0
+        day_spans = {}
+        for course_index in sorted(groups):  # same order of meetings as in TimeTable
+            self.catalog.extend_span(day_spans, day_class, groups[course_index])
+        return self.catalog.get_span_minutes(day_class, day_spans[day_class])
+
+    def get_fitness(self) -> float:
+        if self.overlaps > self.catalog.max_overlaps:
+            return 0
+        return 1 / self.total_minutes
+
+    def get_changed_groups(self, course_index: int, position: int, day_class: int
+                           ) -> dict[int, tuple[tuple[int, int], ...]]:
+        groups = dict(self.day_groups.get(day_class, {}))
+        groups.pop(course_index, None)
+        for slot_class, slots in self.catalog.group_slots[course_index][position]:
+            if slot_class == day_class:
+                groups[course_index] = slots
+        return groups
+
+    def get_change(self, course_index: int, position: int) -> tuple[list[int], dict[int, int], int, dict[int, int]]:
+        """Returns positions, conflicts, overlaps and minutes of touched days after changing the group of a course"""
+        old_position = self.positions[course_index]
+        positions = list(self.positions)
+        positions[course_index] = position
+        conflicts = dict(self.conflicts)
+        for day_class, count in self.catalog.get_group_conflicts(course_index, old_position, positions).items():
+            conflicts[day_class] -= count
+        for day_class, count in self.catalog.get_group_conflicts(course_index, position, positions).items():
+            conflicts[day_class] = conflicts.get(day_class, 0) + count
+        overlaps = self.catalog.count_overlaps(conflicts, positions)
+
+        touched_days = {day_class for group_position in (old_position, position)
+                        for day_class, _ in self.catalog.group_slots[course_index][group_position]}
+        day_minutes = {day_class: self.get_day_minutes(day_class,
+                                                       self.get_changed_groups(course_index, position, day_class))
+                       for day_class in touched_days}
+        return positions, conflicts, overlaps, day_minutes
+
+    def get_changed_overlaps_and_minutes(self, course_index: int, position: int) -> tuple[int, int]:
+        """Returns overlaps and total minutes after changing the group of a course, without changing the state"""
+        _, _, overlaps, day_minutes = self.get_change(course_index, position)
+        return overlaps, self.total_minutes + sum(minutes - self.day_minutes.get(day_class, 0)
+                                                  for day_class, minutes in day_minutes.items())
+
+    def get_changed_fitness(self, course_index: int, position: int) -> float:
+        """Returns fitness after changing the group of a course, without changing the state"""
+        overlaps, total_minutes = self.get_changed_overlaps_and_minutes(course_index, position)
+        if overlaps > self.catalog.max_overlaps:
+            return 0
+        return 1 / total_minutes
+
+    def change(self, course_index: int, position: int) -> None:
+        if position == self.positions[course_index]:
+            return
+        positions, conflicts, overlaps, day_minutes = self.get_change(course_index, position)
+        for day_class, minutes in day_minutes.items():
+            groups = self.get_changed_groups(course_index, position, day_class)
+            if groups:
+                self.day_groups[day_class] = groups
+            else:
+                self.day_groups.pop(day_class, None)
+            self.total_minutes += minutes - self.day_minutes.get(day_class, 0)
+            if minutes:
+                self.day_minutes[day_class] = minutes
+            else:
+                self.day_minutes.pop(day_class, None)
+        self.positions = positions
+        self.conflicts = {day_class: count for day_class, count in conflicts.items() if count}
+        self.overlaps = overlaps
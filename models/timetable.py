@@ -1,7 +1,7 @@
 import csv
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any
 
 from config.config_manager import ConfigManager
@@ -10,10 +10,11 @@ from models.meeting import Meeting
 
 class TimeTable:
     def __init__(self):
-        self.schedule: dict[datetime, list[Meeting]] = {}
+        self.schedule: dict[int, list[Meeting]] = {}  # day (see Meeting) -> meetings
         self.config: ConfigManager = ConfigManager()
         hours_in_day = 24
         self.travel_times: dict[int, timedelta] = {x: timedelta(minutes=0) for x in range(hours_in_day)}
+        self.travel_minutes: list[int] = [0] * hours_in_day
         self.load_travel_times()
         self.catalog_name: str = ''
 
@@ -28,26 +29,26 @@ class TimeTable:
                 if self.travel_times[i] != timedelta(minutes=0):
                     raise ValueError(f"Travel time {i} already set - probably overlapping times in config.json file.")
                 self.travel_times[i] = timedelta(minutes=time)
+                self.travel_minutes[i] = time
 
     def add_meetings(self, meetings: list[Meeting]) -> None:
         for meet in meetings:
-            meet_date = meet.get_date_without_time()
-            if meet_date not in self.schedule:
-                self.schedule[meet_date] = [meet]
+            if meet.day not in self.schedule:
+                self.schedule[meet.day] = [meet]
             else:
-                self.schedule[meet_date].append(meet)
+                self.schedule[meet.day].append(meet)
 
     def sort_meetings(self) -> None:
-        for date in self.schedule:
-            self.schedule[date].sort(key=lambda meet: meet.start_time)
+        for day in self.schedule:
+            self.schedule[day].sort(key=lambda meet: meet.start)
 
         self.schedule = dict(sorted(self.schedule.items(), key=lambda item: item[0]))
 
     def check_for_overlaps(self) -> bool:
         """Check for overlaps in schedule, max 1 overlap is allowed"""
         overlaps_count = 0
-        for date in self.schedule:
-            meetings = self.schedule[date]
+        for day in self.schedule:
+            meetings = self.schedule[day]
             for i in range(len(meetings) - 1):
                 if meetings[i].is_overlapping(meetings[i + 1]):
                     # print(f"Overlap found between {meetings[i]} and {meetings[i + 1]}")
@@ -57,22 +58,23 @@ class TimeTable:
         return False
 
     def get_total_university_time(self) -> timedelta:
+        return timedelta(minutes=self.get_total_university_minutes())
+
+    def get_total_university_minutes(self) -> int:
         # meetings need to be sorted
-        total_time = timedelta()
-        for date in self.schedule:
-            # old_time = total_time
-            first_meet = self.schedule[date][0]
-            last_meet = self.schedule[date][-1]
-            total_time += last_meet.end_time - first_meet.start_time
+        total_time = 0
+        for day in self.schedule:
+            first_meet = self.schedule[day][0]
+            last_meet = self.schedule[day][-1]
+            total_time += last_meet.end - first_meet.start
             # matching travel time
-            total_time += self.travel_times[first_meet.start_time.hour]
-            total_time += self.travel_times[last_meet.end_time.hour]
-            # print(f"Estimated time for {date.strftime('%d.%m.%Y')} is {total_time - old_time}",
-            #       f"from {first_meet.start_time} to {last_meet.end_time}", self.schedule[date])
+            total_time += self.travel_minutes[first_meet.start // 60]
+            total_time += self.travel_minutes[last_meet.end // 60 % 24]
         return total_time
 
     def to_dict(self) -> dict[str, list[str]]:
-        return {date.strftime('%d.%m.%Y'): [str(meet) for meet in meets] for date, meets in self.schedule.items()}
+        return {date.fromordinal(day).strftime('%d.%m.%Y'): [str(meet) for meet in meets]
+                for day, meets in self.schedule.items()}
 
     def to_ui_format(self) -> List[Dict[str, Any]]:
         """
@@ -80,7 +82,8 @@ class TimeTable:
                  with days of the week and a list of meetings, as well as the start and end dates of the week.
         """
         weeks = {}
-        for date_obj, meets in self.schedule.items():
+        for day, meets in self.schedule.items():
+            date_obj = date.fromordinal(day)
             week = date_obj.isocalendar()[1]  # means week number in year
             if week not in weeks:
                 weeks[week] = {}
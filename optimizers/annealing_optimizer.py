@@ -0,0 +1,124 @@
+import math
+import random
+from collections import deque
+from typing import Optional
+
+from models.course_manager import CourseManager
+from models.solution_state import SolutionState
+from optimizers.base_optimizer import BaseOptimizer
+
+
+class AnnealingOptimizer(BaseOptimizer):
+    """
+    Simulated annealing over single solution, every move changes the group of one course and is rated
+    incrementally (see SolutionState). Cost is total university time in minutes, solutions with more overlaps
+    than allowed (see Catalog.max_overlaps) get overlap_penalty added, so the search can pass through them.
+    Temperature is multiplied by cooling_rate after every move, after iterations moves the search restarts
+    from the best solution with initial temperature. With tabu_size, courses can not return to groups
+    they left in the last tabu_size moves, unless it gives a new best solution.
+    """
+    min_temperature: float = 1e-9
+
+    def __init__(self, iterations: int = 20000, cooling_rate: float = 0.9995, restarts: int = 3,
+                 initial_acceptance: float = 0.5, tabu_size: int = 0, course_manager: CourseManager = None,
+                 time_limit: float = None, target_fitness: float = None):
+        super().__init__(course_manager, time_limit, target_fitness)
+        self.iterations: int = iterations  # per restart
+        self.cooling_rate: float = cooling_rate
+        self.restarts: int = restarts
+        self.initial_acceptance: float = initial_acceptance  # probability of accepting average worse move at start
+        self.tabu_size: int = tabu_size
+        self.tabu: deque[tuple[int, int]] = deque()  # (course index, group position) in order of leaving
+        self.movable_courses: list[int] = [course_index for course_index, group_ids in enumerate(self.accepted_values)
+                                           if len(group_ids) > 1]
+        self.state: Optional[SolutionState] = None
+        self.cost: float = 0
+        self.best_cost: float = math.inf
+        self.initial_temperature: float = 1
+        self.temperature: float = 1
+        self.overlap_penalty: float = 0
+
+    def get_cost(self, overlaps: int, total_minutes: int) -> float:
+        return total_minutes + (self.overlap_penalty if overlaps > self.state.catalog.max_overlaps else 0)
+
+    def get_random_move(self) -> tuple[int, int]:
+        course_index = random.choice(self.movable_courses)
+        position = random.randrange(len(self.accepted_values[course_index]) - 1)
+        if position >= self.state.positions[course_index]:
+            position += 1  # any group except the current one
+        return course_index, position
+
+    def calibrate_temperature(self, samples: int = 100) -> None:
+        """Sets initial temperature so that average worse move is accepted with initial_acceptance probability"""
+        cost_increases = []
+        for _ in range(samples):
+            _, total_minutes = self.state.get_changed_overlaps_and_minutes(*self.get_random_move())
+            self.evaluations += 1
+            if total_minutes > self.state.total_minutes:
+                cost_increases.append(total_minutes - self.state.total_minutes)
+        average_increase = sum(cost_increases) / len(cost_increases) if cost_increases else 1
+        self.initial_temperature = -average_increase / math.log(self.initial_acceptance)
+        self.overlap_penalty = 2 * self.initial_temperature
+
+    def start(self, solution: list[int]) -> None:
+        self.state = self.course_manager.get_solution_state(solution)
+        self.tabu.clear()
+        if not self.overlap_penalty:
+            self.calibrate_temperature()
+        self.temperature = self.initial_temperature
+        self.cost = self.get_cost(self.state.overlaps, self.state.total_minutes)
+        self.update_best()
+
+    def update_best(self) -> bool:
+        if self.state.overlaps > self.state.catalog.max_overlaps or self.cost >= self.best_cost:
+            return False
+        self.best_cost = self.cost
+        self.best_fitness = self.state.get_fitness()
+        self.best_solution = self.course_manager.get_solution_from_state(self.state)
+        print("New best solution found", self.best_fitness, self.best_solution)
+        return True
+
+    def run_iteration(self) -> bool:
+        """Tries one move, returns true if it gave a new best solution"""
+        course_index, position = self.get_random_move()
+        overlaps, total_minutes = self.state.get_changed_overlaps_and_minutes(course_index, position)
+        self.evaluations += 1
+        cost = self.get_cost(overlaps, total_minutes)
+        self.temperature = max(self.temperature * self.cooling_rate, self.min_temperature)
+        is_new_best = overlaps <= self.state.catalog.max_overlaps and cost < self.best_cost
+        if self.tabu_size and (course_index, position) in self.tabu and not is_new_best:
+            return False
+        if cost > self.cost and random.random() >= math.exp((self.cost - cost) / self.temperature):
+            return False
+
+        if self.tabu_size:
+            self.tabu.append((course_index, self.state.positions[course_index]))
+            if len(self.tabu) > self.tabu_size:
+                self.tabu.popleft()
+        self.state.change(course_index, position)
+        self.cost = cost
+        return self.update_best()
+
+    def run(self) -> None:
+        self.start_timer()
+        if not self.movable_courses:
+            # every course has a single group - the only solution is rated, there is no move to calibrate with
+            self.state = self.course_manager.get_solution_state(self.generate_random_solution())
+            self.evaluations += 1
+            self.cost = self.get_cost(self.state.overlaps, self.state.total_minutes)
+            self.update_best()
+        else:
+            for restart in range(self.restarts + 1):
+                self.start(self.best_solution if self.best_solution else self.generate_random_solution())
+                for i in range(self.iterations):
+                    self.run_iteration()
+                    if self.is_budget_exhausted():
+                        break
+                if self.is_budget_exhausted():
+                    break
+        self.print_run_summary()
+        if not self.best_solution:
+            print("No solution without overlaps found")
+            return
+
+        self.print_best_solution()
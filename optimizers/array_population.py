@@ -0,0 +1,85 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class ArrayPopulation:
+    """
+    GA population stored as 2-D array of group positions (see Catalog), one row per individual,
+    with fitness in a separate array. Genetic operators draw random numbers for all individuals at once.
+    """
+
+    def __init__(self, group_counts: list[int], rng: np.random.Generator):
+        self.group_counts: np.ndarray = np.array(group_counts, dtype=np.int64)  # course index -> number of groups
+        self.rng: np.random.Generator = rng
+        self.genomes: np.ndarray = np.empty((0, len(group_counts)), dtype=np.int64)
+        self.fitness: np.ndarray = np.empty(0, dtype=np.float64)
+        # mixed radix weights turning genomes into unique integers, None if they would not fit in int64
+        self.genome_key_weights: Optional[np.ndarray] = None
+        if math.prod(group_counts) < 2 ** 63:
+            weights = np.cumprod([1] + list(group_counts[:0:-1]))[::-1]
+            self.genome_key_weights = np.ascontiguousarray(weights, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.genomes)
+
+    def get_random_genomes(self, count: int) -> np.ndarray:
+        return self.rng.integers(0, self.group_counts, size=(count, len(self.group_counts)))
+
+    def select_parent_pairs(self, count: int, tournament_size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns two best individuals of each of count tournaments (participants drawn with replacement)"""
+        participants = self.rng.integers(0, len(self), size=(count, max(tournament_size, 2)))
+        order = np.argsort(-self.fitness[participants], axis=1, kind='stable')
+        rows = np.arange(count)
+        return (self.genomes[participants[rows, order[:, 0]]],
+                self.genomes[participants[rows, order[:, 1]]])
+
+    def crossover(self, parents1: np.ndarray, parents2: np.ndarray,
+                  crossover_probability: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Uniform crossover of parent pairs chosen with crossover_probability, other pairs are copied.
+        Returns children of all pairs and mask of children created by crossover.
+        """
+        crossed = self.rng.random(len(parents1)) < crossover_probability
+        from_first_parent = (self.rng.random(parents1.shape) < 0.5) | ~crossed[:, None]
+        children = np.concatenate([np.where(from_first_parent, parents1, parents2),
+                                   np.where(from_first_parent, parents2, parents1)])
+        return children, np.concatenate([crossed, crossed])
+
+    def mutate(self, genomes: np.ndarray, mutation_probability: float, rows: np.ndarray = None) -> None:
+        """Changes every gene (of given rows only, if mask is given) to random group with mutation_probability"""
+        mutated = self.rng.random(genomes.shape) < mutation_probability
+        if rows is not None:
+            mutated &= rows[:, None]
+        row_indices, course_indices = np.nonzero(mutated)
+        genomes[row_indices, course_indices] = self.rng.integers(0, self.group_counts[course_indices])
+
+    def get_best_indices(self, count: int) -> np.ndarray:
+        """Returns indices of count best individuals, best first, without sorting the whole population"""
+        count = min(count, len(self))
+        if count <= 0:
+            return np.empty(0, dtype=np.int64)
+        indices = np.argpartition(-self.fitness, count - 1)[:count]
+        return indices[np.argsort(-self.fitness[indices], kind='stable')]
+
+    def get_worst_indices(self, count: int) -> np.ndarray:
+        count = min(count, len(self))
+        if count <= 0:
+            return np.empty(0, dtype=np.int64)
+        return np.argpartition(self.fitness, count - 1)[:count]
+
+    def get_diversity(self) -> tuple[float, float]:
+        """Returns share of distinct genomes and mean gene entropy (normalized to 0-1) of the population"""
+        if self.genome_key_weights is not None:
+            distinct_ratio = len(np.unique(self.genomes @ self.genome_key_weights)) / len(self)
+        else:
+            distinct_ratio = len(np.unique(self.genomes, axis=0)) / len(self)
+        entropies = []
+        for course_index, group_count in enumerate(self.group_counts.tolist()):
+            if group_count < 2:
+                continue
+            probabilities = np.bincount(self.genomes[:, course_index], minlength=group_count) / len(self)
+            probabilities = probabilities[probabilities > 0]
+            entropies.append(float(-(probabilities * np.log(probabilities)).sum() / np.log(group_count)))
+        return distinct_ratio, sum(entropies) / len(entropies) if entropies else 1
@@ -0,0 +1,38 @@
+from functools import partial
+
+from models.course_manager import CourseManager
+from models.parallel_evaluator import ParallelEvaluator
+from optimizers.base_optimizer import BaseOptimizer
+from optimizers.decomposed_optimizer import DecomposedOptimizer
+from optimizers.exact_optimizer import ExactOptimizer
+from optimizers.ga_optimizer import GAOptimizer
+
+
+def create_optimizer(max_exact_solutions: int = 1_000_000, time_limit: float = None, target_fitness: float = None,
+                     **ga_parameters) -> BaseOptimizer:
+    """
+    Returns ExactOptimizer if number of possible solutions is small enough to search them exactly,
+    otherwise GAOptimizer with given parameters. Both stop at time limit (seconds) or target fitness if given.
+    Courses that never meet on the same day are split into components optimized separately (DecomposedOptimizer),
+    each with optimizer selected by its own number of possible solutions, genetic algorithms of all components
+    share one pool of workers.
+    """
+    course_manager = CourseManager()
+    components = course_manager.get_course_components()
+    if len(components) > 1:
+        print(f"Optimizing {len(components)} independent groups of courses separately")
+        return DecomposedOptimizer(partial(select_optimizer, max_exact_solutions=max_exact_solutions, **ga_parameters),
+                                   course_manager, time_limit, target_fitness, ga_parameters.get('workers', 0))
+    return select_optimizer(course_manager, max_exact_solutions, time_limit, target_fitness, **ga_parameters)
+
+
+def select_optimizer(course_manager: CourseManager, max_exact_solutions: int = 1_000_000, time_limit: float = None,
+                     target_fitness: float = None, parallel_evaluator: ParallelEvaluator = None,
+                     **ga_parameters) -> BaseOptimizer:
+    possible_solutions = course_manager.calculate_possible_solutions()
+    if possible_solutions <= max_exact_solutions:
+        print(f"Using exact search for {possible_solutions} possible solutions")
+        return ExactOptimizer(course_manager, time_limit, target_fitness)
+    print(f"Using genetic algorithm for {possible_solutions} possible solutions")
+    return GAOptimizer(**ga_parameters, course_manager=course_manager, time_limit=time_limit,
+                       target_fitness=target_fitness, parallel_evaluator=parallel_evaluator)
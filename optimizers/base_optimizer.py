@@ -1,18 +1,59 @@
+import json
 from abc import ABC, abstractmethod
+from typing import Optional
 from models.course_manager import CourseManager
 import random
+import time
 from models.timetable import TimeTable
 
 
 class BaseOptimizer(ABC):
-    def __init__(self):
-        self.course_manager: CourseManager = CourseManager()
+    def __init__(self, course_manager: CourseManager = None, time_limit: float = None,
+                 target_fitness: float = None):
+        self.course_manager: CourseManager = course_manager or CourseManager()
         self.accepted_values: list[list[int]] = list(self.course_manager.get_group_ids_for_all_courses().values())
         if not self.accepted_values:
             raise ValueError("No input courses found")
         self.best_solution: list[int] = []
         self.best_fitness: int = 0
+        # anytime mode - run returns best solution so far when time limit (seconds) or target fitness is reached
+        self.time_limit: Optional[float] = time_limit
+        self.target_fitness: Optional[float] = target_fitness
+        self.start_time: Optional[float] = None
+        self.evaluations: int = 0
+        self.show_solution: bool = True  # run prints timetable of the best solution at the end
 
+    def start_timer(self) -> None:
+        self.start_time = time.perf_counter()
+        self.evaluations = 0
+
+    def get_elapsed_time(self) -> float:
+        return time.perf_counter() - self.start_time if self.start_time is not None else 0
+
+    def is_budget_exhausted(self) -> bool:
+        if self.target_fitness is not None and self.best_fitness >= self.target_fitness:
+            return True
+        return self.time_limit is not None and self.get_elapsed_time() >= self.time_limit
+
+    def print_run_summary(self) -> None:
+        reason = ""
+        if self.target_fitness is not None and self.best_fitness >= self.target_fitness:
+            reason = " (target fitness reached)"
+        elif self.time_limit is not None and self.get_elapsed_time() >= self.time_limit:
+            reason = " (time limit reached)"
+        print(f"Finished after {self.get_elapsed_time():.2f} s and {self.evaluations} evaluations{reason}")
+
+    def print_best_solution(self) -> None:
+        if not self.show_solution:
+            return
+        final_timetable = self.get_timetable_from_best_solution()
+
+        print(final_timetable.to_str_full())
+
+        groups = self.course_manager.get_classes_group_dict_from_solution(self.best_solution)
+        print(json.dumps({str(k): v for k, v in groups.items()}, indent=4, default=str, ensure_ascii=False))
+
+        print("All time best", self.best_fitness, self.best_solution)
 
     def generate_random_solution(self) -> list[int]:
         solution = []
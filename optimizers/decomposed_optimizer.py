@@ -0,0 +1,153 @@
+import math
+from typing import Callable, Optional
+
+from models.course_manager import CourseManager
+from models.parallel_evaluator import ParallelEvaluator
+from optimizers.base_optimizer import BaseOptimizer
+
+ComponentResult = tuple[int, int, list[int]]  # total minutes, overlaps and solution of a component
+
+
+class DecomposedOptimizer(BaseOptimizer):
+    """
+    Optimizes independent groups of courses (see Catalog.get_course_components) separately and combines
+    their best solutions, create_optimizer(course_manager, time_limit=...) gives optimizer of a component.
+    Total university time and overlaps are sums over components, so with at most one overlap allowed
+    the best solution is made of the best solution of one component with one allowed overlap and the best
+    solutions of the others without overlaps. Every component is searched with one allowed overlap first,
+    components are searched again without overlaps only if more than one of them used the overlap.
+    Time limit and target fitness apply to the combined solution, they are checked between component searches.
+    """
+
+    def __init__(self, create_optimizer: Callable[..., BaseOptimizer], course_manager: CourseManager = None,
+                 time_limit: float = None, target_fitness: float = None, workers: int = 0):
+        super().__init__(course_manager, time_limit, target_fitness)
+        self.create_optimizer: Callable[..., BaseOptimizer] = create_optimizer
+        self.components: list[list[int]] = self.course_manager.get_course_components()
+        # (component, allowed overlaps) -> course manager of the component
+        self.component_managers: dict[tuple[int, int], CourseManager] = {}
+        # opt-in, one pool of given number of processes (all cores for -1) rates solutions of all components
+        self.workers: int = workers
+        self.parallel_evaluator: Optional[ParallelEvaluator] = None
+        # component -> allowed overlaps -> result of the search, None if no feasible solution was found
+        self.results: list[dict[int, Optional[ComponentResult]]] = [{} for _ in self.components]
+        self.pending_runs: list[tuple[int, int]] = []  # (component, allowed overlaps) left to search
+        # component -> found solution with the fewest overlaps (feasible or not), used when the budget runs out
+        self.partial_results: list[Optional[ComponentResult]] = [None for _ in self.components]
+        self.best_total_minutes: Optional[int] = None
+
+    def get_run_time_limit(self, max_overlaps: int) -> Optional[float]:
+        """Splits remaining time evenly between this and pending runs, keeping a share for runs without overlaps"""
+        if self.time_limit is None:
+            return None
+        runs = len(self.pending_runs) + 1 + (1 if max_overlaps else 0)
+        return max(self.time_limit - self.get_elapsed_time(), 0) / runs
+
+    def create_component_managers(self) -> None:
+        self.component_managers = {(component, max_overlaps): self.course_manager.get_component_manager(
+            course_indices, max_overlaps) for component, course_indices in enumerate(self.components)
+            for max_overlaps in (1, 0)}
+        if self.workers:
+            # every worker gets catalogs of all components once, instead of a new pool per component search
+            self.parallel_evaluator = ParallelEvaluator(
+                [manager.batch_evaluator for manager in self.component_managers.values()],
+                self.workers if self.workers > 0 else None)
+
+    def run_component(self, component: int, max_overlaps: int) -> Optional[ComponentResult]:
+        course_manager = self.component_managers[(component, max_overlaps)]
+        print(f"Optimizing {len(self.components[component])} courses of component {component} "
+              f"with at most {max_overlaps} overlaps")
+        parameters = {}
+        if self.parallel_evaluator:
+            parameters['parallel_evaluator'] = self.parallel_evaluator.get_shared(
+                list(self.component_managers).index((component, max_overlaps)))
+        optimizer = self.create_optimizer(course_manager, time_limit=self.get_run_time_limit(max_overlaps),
+                                          **parameters)
+        optimizer.show_solution = False  # only the combined solution is printed
+        optimizer.run()
+        self.evaluations += optimizer.evaluations
+        if not optimizer.best_solution:
+            return None
+        positions = course_manager.get_positions(optimizer.best_solution)
+        result = (course_manager.catalog.get_total_minutes(positions), course_manager.catalog.get_overlaps(positions),
+                  optimizer.best_solution)
+        partial_result = self.partial_results[component]
+        if partial_result is None or (result[1], result[0]) < (partial_result[1], partial_result[0]):
+            self.partial_results[component] = result
+        return result if optimizer.best_fitness else None
+
+    def get_result_without_overlaps(self, component: int) -> Optional[ComponentResult]:
+        if 0 in self.results[component]:
+            return self.results[component][0]
+        result = self.results[component].get(1)
+        return result if result is not None and result[1] == 0 else None
+
+    def combine_results(self) -> bool:
+        """Combines results of all components into the best solution, returns true if it improved"""
+        best_total_minutes, best_solutions = math.inf, None
+        for component_with_overlap in [None] + list(range(len(self.components))):
+            results = [self.results[component].get(1) if component == component_with_overlap
+                       else self.get_result_without_overlaps(component) for component in range(len(self.components))]
+            if None in results:
+                continue
+            total_minutes = sum(result[0] for result in results)
+            if total_minutes < best_total_minutes:
+                best_total_minutes, best_solutions = total_minutes, [result[2] for result in results]
+        if best_solutions is None or (self.best_total_minutes is not None
+                                      and best_total_minutes >= self.best_total_minutes):
+            return False
+        self.best_total_minutes = best_total_minutes
+        self.best_fitness = 1 / best_total_minutes
+        self.best_solution = self.course_manager.get_solution_from_components(self.components, best_solutions)
+        print("New best solution found", self.best_fitness, self.best_solution)
+        return True
+
+    def combine_partial_results(self) -> None:
+        """Combines solutions with the fewest overlaps of all components, if the budget ran out before a full search"""
+        if None in self.partial_results:
+            return
+        results = self.partial_results
+        self.best_solution = self.course_manager.get_solution_from_components(
+            self.components, [result[2] for result in results])
+        self.best_fitness = self.course_manager.rate_solution(self.best_solution)
+        print(f"Using solution with {sum(result[1] for result in results)} overlaps found before the budget ran out")
+
+    def run_iteration(self) -> bool:
+        """
+        Searches one pending component, returns true if it improved the best solution.
+        Results are combined after every search, so the budget can be checked against the best combined solution.
+        """
+        component, max_overlaps = self.pending_runs.pop(0)
+        self.results[component][max_overlaps] = self.run_component(component, max_overlaps)
+        if not self.pending_runs and max_overlaps:
+            # the best solution can use the overlap in one component only
+            components_with_overlap = [component for component, results in enumerate(self.results)
+                                       if results[1] is not None and results[1][1]]
+            if len(components_with_overlap) > 1:
+                self.pending_runs = [(component, 0) for component in components_with_overlap]
+        return self.combine_results()
+
+    def run(self) -> None:
+        self.start_timer()
+        self.results = [{} for _ in self.components]
+        self.pending_runs = [(component, 1) for component in range(len(self.components))]
+        self.partial_results = [None for _ in self.components]
+        self.create_component_managers()
+        try:
+            # runs get share of remaining time, so every component returns its best so far
+            while self.pending_runs and not self.is_budget_exhausted():
+                self.run_iteration()
+        finally:
+            if self.parallel_evaluator:
+                self.parallel_evaluator.close()
+                self.parallel_evaluator = None
+        self.print_run_summary()
+        if self.pending_runs:
+            print(f"Skipped {len(self.pending_runs)} component searches")
+            if not self.best_solution:
+                self.combine_partial_results()
+        if not self.best_solution:
+            print("No solution without overlaps found")
+            return
+
+        self.print_best_solution()
@@ -0,0 +1,177 @@
+from typing import Optional
+
+from models.course_manager import CourseManager
+from optimizers.base_optimizer import BaseOptimizer
+
+Span = tuple[int, int, int, int]  # first start, last start, course index and end of the last started meeting
+
+
+class ExactOptimizer(BaseOptimizer):
+    """
+    Branch and bound over courses (as group positions, see Catalog), gives proven optimal solution.
+    Courses with fewest groups and most conflicts are assigned first. A branch is pruned when its overlaps
+    already break the "at most one overlap" rule (see Catalog.max_overlaps) or when lower bound of its total
+    university time is not better than the best solution found so far.
+    """
+
+    def __init__(self, course_manager: CourseManager = None, time_limit: float = None,
+                 target_fitness: float = None):
+        super().__init__(course_manager, time_limit, target_fitness)
+        catalog = self.course_manager.catalog
+        self.catalog = catalog
+        courses_count = len(catalog.group_slots)
+        conflict_degrees = [0] * courses_count
+        for (course_index, other_course_index), course_conflicts in catalog.conflicts.items():
+            conflict_degrees[course_index] += len(course_conflicts)
+            conflict_degrees[other_course_index] += len(course_conflicts)
+        self.course_order: list[int] = sorted(range(courses_count), key=lambda course_index: (
+            len(catalog.group_slots[course_index]), -conflict_degrees[course_index]))
+
+        # course index -> group position -> day class -> span of the group
+        self.group_spans: list[list[dict[int, Span]]] = []
+        for course_index, course_slots in enumerate(catalog.group_slots):
+            self.group_spans.append([])
+            for group_slots in course_slots:
+                day_spans = {}
+                for day_class, slots in group_slots:
+                    catalog.extend_span(day_spans, day_class, slots)
+                self.group_spans[-1].append({day_class: (first_start, last_start, course_index, last_end)
+                                             for day_class, (first_start, last_start, last_end) in day_spans.items()})
+        # day class -> search depth after which no more meetings can be added to the class
+        self.class_final_depths: list[int] = [0] * len(catalog.day_class_weights)
+        for depth, course_index in enumerate(self.course_order, 1):
+            for group_spans in self.group_spans[course_index]:
+                for day_class in group_spans:
+                    self.class_final_depths[day_class] = depth
+
+        # minute -> lower bound of travel time minus first start / last end plus travel time, over all earlier
+        # first starts / later last ends, every meeting that starts later than a minute also ends after its duration
+        ends = [end for course_spans in self.group_spans for group_spans in course_spans
+                for _, _, _, end in group_spans.values()]
+        self.max_end: int = max(ends, default=0)
+        self.min_duration: int = min((end - start for course_slots in catalog.group_slots for group_slots in course_slots
+                                      for _, slots in group_slots for start, end in slots), default=0)
+        travel_minutes = catalog.travel_minutes
+        self.first_start_bounds: list[int] = []
+        for minute in range(self.max_end + 1):
+            value = travel_minutes[minute // 60 % 24] - minute
+            self.first_start_bounds.append(min(value, self.first_start_bounds[-1]) if minute else value)
+        self.last_end_bounds: list[int] = [0] * (self.max_end + 1)
+        for minute in range(self.max_end, -1, -1):
+            value = minute + travel_minutes[minute // 60 % 24]
+            self.last_end_bounds[minute] = min(value, self.last_end_bounds[minute + 1]) \
+                if minute < self.max_end else value
+        # course index -> group position -> day class -> lower bound of the class if the group was alone in it
+        self.group_bounds: list[list[dict[int, int]]] = [
+            [{day_class: self.get_day_bound(day_class, span) for day_class, span in group_spans.items()}
+             for group_spans in course_spans] for course_spans in self.group_spans]
+
+        self.best_total_minutes: Optional[int] = None
+        # (depth, positions, day spans, conflicts) of branches left to explore
+        self.stack: list[tuple[int, list[int], dict[int, Span], dict[int, int]]] = []
+        self.is_optimal: bool = False
+
+    def get_day_minutes(self, day_class: int, span: Span) -> int:
+        first_start, _, _, last_end = span
+        travel_minutes = self.catalog.travel_minutes
+        return self.catalog.day_class_weights[day_class] * (
+                last_end - first_start + travel_minutes[first_start // 60] + travel_minutes[last_end // 60 % 24])
+
+    def get_day_bound(self, day_class: int, span: Span) -> int:
+        """Lower bound of day class time, for any meetings added to the span later"""
+        first_start, last_start, _, _ = span
+        return self.catalog.day_class_weights[day_class] * (
+                self.first_start_bounds[first_start] +
+                self.last_end_bounds[min(last_start + self.min_duration, self.max_end)])
+
+    def get_bound(self, depth: int, day_spans: dict[int, Span]) -> int:
+        bound = sum(self.get_day_minutes(day_class, span) if self.class_final_depths[day_class] <= depth
+                    else self.get_day_bound(day_class, span) for day_class, span in day_spans.items())
+        # days not used yet - any single remaining course adds at least its cheapest group on them
+        remaining_bound = 0
+        for course_index in self.course_order[depth:]:
+            remaining_bound = max(remaining_bound, min(
+                sum(day_bound for day_class, day_bound in group_bounds.items() if day_class not in day_spans)
+                for group_bounds in self.group_bounds[course_index]))
+        return bound + remaining_bound
+
+    def get_group_conflicts(self, course_index: int, position: int, positions: list[int]) -> dict[int, int]:
+        """Conflicts of the group with itself and with groups of already assigned courses"""
+        conflicts = {}
+        catalog = self.catalog
+        for course_pair in catalog.course_conflicts[course_index]:
+            other_course_index = course_pair[1] if course_pair[0] == course_index else course_pair[0]
+            other_position = position if other_course_index == course_index else positions[other_course_index]
+            if other_position < 0:
+                continue
+            key = (position, other_position) if course_pair[0] == course_index else (other_position, position)
+            for day_class, count in catalog.conflicts[course_pair].get(key, {}).items():
+                conflicts[day_class] = conflicts.get(day_class, 0) + count
+        return conflicts
+
+    def start(self) -> None:
+        self.best_solution = []
+        self.best_fitness = 0
+        self.best_total_minutes = None
+        self.is_optimal = False
+        self.stack = [(0, [-1] * len(self.course_order), {}, {})]
+
+    def run_iteration(self) -> bool:
+        """Explores one branch, returns true if it improved the best solution"""
+        depth, positions, day_spans, conflicts = self.stack.pop()
+        self.evaluations += 1
+        weights = self.catalog.day_class_weights
+        if depth == len(self.course_order):
+            if self.catalog.count_overlaps(conflicts, positions) > self.catalog.max_overlaps:
+                return False
+            total_minutes = sum(self.get_day_minutes(day_class, span) for day_class, span in day_spans.items())
+            if self.best_total_minutes is not None and total_minutes >= self.best_total_minutes:
+                return False
+            self.best_total_minutes = total_minutes
+            self.best_fitness = 1 / total_minutes
+            self.best_solution = [group_ids[position] for group_ids, position
+                                  in zip(self.catalog.group_ids, positions)]
+            print("New best solution found", self.best_fitness, self.best_solution)
+            return True
+
+        course_index = self.course_order[depth]
+        children = []
+        for position, group_spans in enumerate(self.group_spans[course_index]):
+            child_conflicts = dict(conflicts)
+            for day_class, count in self.get_group_conflicts(course_index, position, positions).items():
+                child_conflicts[day_class] = child_conflicts.get(day_class, 0) + count
+            if sum(weights[day_class] for day_class in child_conflicts) > self.catalog.max_overlaps:
+                continue  # every day with overlapping meetings has at least one overlap
+            child_spans = dict(day_spans)
+            for day_class, group_span in group_spans.items():
+                span = child_spans.get(day_class)
+                if span is None:
+                    child_spans[day_class] = group_span
+                elif group_span[1:3] > span[1:3]:  # meetings starting at the same time are sorted by course
+                    child_spans[day_class] = (min(span[0], group_span[0]),) + group_span[1:]
+                else:
+                    child_spans[day_class] = (min(span[0], group_span[0]),) + span[1:]
+            bound = self.get_bound(depth + 1, child_spans)
+            if self.best_total_minutes is not None and bound >= self.best_total_minutes:
+                continue
+            child_positions = list(positions)
+            child_positions[course_index] = position
+            children.append((bound, (depth + 1, child_positions, child_spans, child_conflicts)))
+        children.sort(key=lambda child: child[0], reverse=True)  # the most promising branch is explored first
+        self.stack.extend(child for _, child in children)
+        return False
+
+    def run(self) -> None:
+        self.start_timer()
+        self.start()
+        while self.stack and not self.is_budget_exhausted():
+            self.run_iteration()
+        self.is_optimal = not self.stack
+        self.print_run_summary()
+        if not self.best_solution:
+            print("No solution without overlaps found")
+            return
+        if self.is_optimal:
+            print(f"Optimal solution found after exploring {self.evaluations} branches")
+
+        self.print_best_solution()
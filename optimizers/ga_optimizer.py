@@ -1,113 +1,198 @@
-import json
 import random
+from typing import Optional
 
-from optimizers.base_optimizer import BaseOptimizer
-
-
-class Individual:
-    def __init__(self, solution):
-        self.solution: list[int] = solution
-        self.fitness: int = 0
-
-    def crossover(self, other) -> tuple['Individual', 'Individual']:
-        solution1 = []
-        solution2 = []
-        for i in range(len(self.solution)):
-            if random.random() < 0.5:
-                solution1.append(self.solution[i])
-                solution2.append(other.solution[i])
-            else:
-                solution1.append(other.solution[i])
-                solution2.append(self.solution[i])
-
-        return Individual(solution1), Individual(solution2)
+import numpy as np
 
-    def mutate(self, mutation_probability: float, allowed_values: list[list[int]]) -> None:
-        for i in range(len(self.solution)):
-            if random.random() < mutation_probability:
-                self.solution[i] = random.choice(allowed_values[i])
-
-    def set_fitness(self, fitness) -> None:
-        self.fitness = fitness
-
-    def clone(self):
-        return Individual(self.solution.copy())
+from models.course_manager import CourseManager
+from models.parallel_evaluator import ParallelEvaluator
+from models.solution_state import SolutionState
+from optimizers.array_population import ArrayPopulation
+from optimizers.base_optimizer import BaseOptimizer
 
 
 class GAOptimizer(BaseOptimizer):
-
-    def __init__(self, population_size, mutation_probability, crossover_probability, generations, elite_percentage):
-        super().__init__()
+    # adaptive mode - gene entropy (or share of distinct genomes) below low_diversity raises mutation probability
+    # and lowers tournament size, entropy above high_diversity moves them back
+    low_diversity: float = 0.25
+    high_diversity: float = 0.6
+    min_distinct_ratio: float = 0.5
+    max_mutation_probability: float = 0.2
+    min_tournament_size: int = 2
+    max_tournament_size: int = 8
+    max_restarts: int = 3  # partial restarts on stagnation before stopping
+    max_local_optima: int = 10_000  # remembered local optima, the set is cleared when it grows larger
+
+    def __init__(self, population_size, mutation_probability, crossover_probability, generations, elite_percentage,
+                 workers: int = 0, course_manager: CourseManager = None, local_search_budget: int = 500,
+                 local_search_mode: str = 'first', time_limit: float = None, target_fitness: float = None,
+                 adaptive: bool = True, parallel_evaluator: ParallelEvaluator = None):
+        super().__init__(course_manager, time_limit, target_fitness)
         self.population_size: int = population_size
         self.mutation_probability: float = mutation_probability
         self.crossover_probability: float = crossover_probability
         self.generations: int = generations
-        self.population: list[Individual] = []
+        # genomes are group positions (see Catalog), numpy generator is seeded from random, so random.seed applies
+        self.population: ArrayPopulation = ArrayPopulation(
+            [len(group_ids) for group_ids in self.course_manager.catalog.group_ids],
+            np.random.default_rng(random.getrandbits(64)))
         self.tournament_size: int = 4
         self.iterations_without_improvement_stop_threshold: int = 20
         self.elite_size: int = int(population_size * elite_percentage / 100)
-
+        # opt-in, fitness is calculated in given number of processes (all cores for -1) or in given shared pool
+        self.parallel_evaluator: Optional[ParallelEvaluator] = parallel_evaluator
+        if workers and parallel_evaluator is None:
+            self.parallel_evaluator = self.course_manager.get_parallel_evaluator(workers if workers > 0 else None)
+        # hill climbing of elite, evaluations per generation (0 disables it), 'first' or 'best' improvement
+        if local_search_mode not in ('first', 'best'):
+            raise ValueError(f"Unknown local search mode {local_search_mode}")
+        self.local_search_budget: int = local_search_budget
+        self.local_search_mode: str = local_search_mode
+        self.local_search_evaluations: int = 0  # left in current generation
+        self.local_optima: set[tuple[int, ...]] = set()  # genomes no single group change can improve
+        self.adaptive: bool = adaptive
+        self.base_mutation_probability: float = mutation_probability
+        self.base_tournament_size: int = self.tournament_size
+        self.diversity: tuple[float, float] = (1, 1)  # share of distinct genomes, mean normalized gene entropy
+        self.restarts: int = 0
 
     def calculate_fitness_all(self) -> None:
-        for individual in self.population:
-            individual.set_fitness(self.course_manager.rate_solution(individual.solution))
+        """Rates the whole population, in worker processes if parallel evaluation is enabled"""
+        genomes = self.population.genomes
+        if self.parallel_evaluator:
+            self.population.fitness = self.course_manager.rate_positions_parallel(genomes, self.parallel_evaluator)
+        else:
+            self.population.fitness = self.course_manager.rate_positions(genomes)
+        self.evaluations += len(genomes)
 
     def initialize_population(self) -> None:
-        for i in range(self.population_size):
-            solution = self.generate_random_solution()
-            individual = Individual(solution)
-            self.population.append(individual)
-
+        self.population.genomes = self.population.get_random_genomes(self.population_size)
         self.calculate_fitness_all()
 
-    def get_random_individuals(self, count=1) -> list[Individual]:
-        return random.choices(self.population, k=count)
-
-    def get_parent_pair_tournament(self) -> list[Individual]:
-        participants = self.get_random_individuals(self.tournament_size)
-        return sorted(participants, key=lambda x: x.fitness, reverse=True)[:2]
+    def get_solution(self, index: int) -> list[int]:
+        return self.course_manager.get_solution_from_positions(self.population.genomes[index].tolist())
 
-    def sort_population(self) -> None:
-        self.population = sorted(self.population, key=lambda x: x.fitness, reverse=True)
+    def update_best(self) -> bool:
+        """Takes the best individual of the population as the best solution if it is better"""
+        best_index = int(np.argmax(self.population.fitness))
+        if self.population.fitness[best_index] > self.best_fitness or not self.best_solution:
+            self.best_fitness = float(self.population.fitness[best_index])
+            self.best_solution = self.get_solution(best_index)
+            return True
+        return False
 
     def run_iteration(self) -> bool:
         """Returns true if improvement was made, false otherwise"""
-        new_population = []
-        self.keep_elite(new_population)
-        while len(new_population) < self.population_size:
-            parent1, parent2 = self.get_parent_pair_tournament()
-            if random.random() < self.crossover_probability:
-                child1, child2 = parent1.crossover(parent2)
-                child1.mutate(self.mutation_probability, self.accepted_values)
-                child2.mutate(self.mutation_probability, self.accepted_values)
-                new_population.extend([child1, child2])
-            else:
-                new_population.extend([parent1.clone(), parent2.clone()])
-        self.population = new_population
-        for individual in self.population:
-            individual.mutate(self.mutation_probability, self.accepted_values)
+        elite = self.keep_elite()
+        offspring_size = self.population_size - len(elite)
+        parents1, parents2 = self.population.select_parent_pairs((offspring_size + 1) // 2, self.tournament_size)
+        children, crossed = self.population.crossover(parents1, parents2, self.crossover_probability)
+        self.population.mutate(children, self.mutation_probability, crossed)
+        self.population.genomes = np.concatenate([elite, children[:offspring_size]])
+        # elite (already improved by local search) is kept unchanged
+        self.population.mutate(self.population.genomes, self.mutation_probability,
+                               np.arange(len(self.population)) >= len(elite))
 
         self.calculate_fitness_all()
-        self.sort_population()
-        best_individual = self.population[0]
-        if best_individual.fitness > self.best_fitness:
-            self.best_fitness = best_individual.fitness
-            self.best_solution = best_individual.solution
+        if self.adaptive:
+            self.adapt_parameters()
+        if self.update_best():
             print(f"New best solution found", self.best_fitness, self.best_solution)
             return True
         return False
 
-    def keep_elite(self, new_population) -> None:
-        # pop is already sorted
-        for i in range(self.elite_size):
-            individual = self.population[i].clone()
-            # self.local_optimization(individual)
-            new_population.append(individual)
+    def get_diversity(self) -> tuple[float, float]:
+        """Returns share of distinct genomes and mean gene entropy (normalized to 0-1) of the population"""
+        return self.population.get_diversity()
+
+    def adapt_parameters(self) -> None:
+        self.diversity = distinct_ratio, entropy = self.get_diversity()
+        if entropy < self.low_diversity or distinct_ratio < self.min_distinct_ratio:
+            self.mutation_probability = min(self.max_mutation_probability, self.mutation_probability * 1.5)
+            self.tournament_size = max(self.min_tournament_size, self.tournament_size - 1)
+        elif entropy > self.high_diversity:
+            self.mutation_probability = max(self.base_mutation_probability, self.mutation_probability / 1.5)
+            self.tournament_size = min(self.max_tournament_size, self.tournament_size + 1)
+
+    def handle_stagnation(self) -> bool:
+        """Called when the best solution has not improved for too long, returns true if the search should go on"""
+        if not self.adaptive or self.restarts >= self.max_restarts:
+            return False
+        self.partial_restart()
+        return True
+
+    def partial_restart(self) -> None:
+        """Keeps the elite and replaces the rest of the population with random individuals"""
+        self.restarts += 1
+        print(f"Partial restart {self.restarts} (distinct genomes {self.diversity[0]:.0%}, "
+              f"gene entropy {self.diversity[1]:.2f})")
+        elite = self.population.genomes[self.population.get_best_indices(self.elite_size)]
+        self.population.genomes = np.concatenate(
+            [elite, self.population.get_random_genomes(self.population_size - len(elite))])
+        self.mutation_probability = self.base_mutation_probability
+        self.tournament_size = self.base_tournament_size
+        self.local_optima.clear()
+        self.calculate_fitness_all()
+
+    def keep_elite(self) -> np.ndarray:
+        """Returns copies of the best genomes (best first), improved by local search"""
+        elite_indices = self.population.get_best_indices(self.elite_size)
+        elite = self.population.genomes[elite_indices]
+        self.local_search_evaluations = self.local_search_budget
+        for genome, fitness in zip(elite, self.population.fitness[elite_indices].tolist()):
+            self.local_optimization(genome, fitness)
+        return elite
+
+    def local_optimization(self, genome: np.ndarray, fitness: float) -> float:
+        """
+        Hill climbing over changes of a single course group, rated incrementally, until no change improves
+        the solution or evaluation budget of the generation is used up. Changes genome in place, returns its fitness.
+        """
+        if self.local_search_evaluations <= 0 or tuple(genome.tolist()) in self.local_optima:
+            return fitness
+        state = SolutionState(self.course_manager.catalog, genome.tolist())
+        moves = [(course_index, position) for course_index, group_count
+                 in enumerate(self.population.group_counts.tolist()) for position in range(group_count)]
+        while True:
+            random.shuffle(moves)
+            best_move, best_fitness = None, fitness
+            for course_index, position in moves:
+                if position == state.positions[course_index]:
+                    continue
+                if self.local_search_evaluations <= 0:
+                    break
+                self.local_search_evaluations -= 1
+                self.evaluations += 1
+                move_fitness = state.get_changed_fitness(course_index, position)
+                if move_fitness > best_fitness:
+                    best_move, best_fitness = (course_index, position), move_fitness
+                    if self.local_search_mode == 'first':
+                        break
+            if best_move is None:
+                if self.local_search_evaluations > 0:
+                    if len(self.local_optima) >= self.max_local_optima:
+                        self.local_optima.clear()
+                    self.local_optima.add(tuple(state.positions))
+                break
+            state.change(*best_move)
+            fitness = best_fitness
+        genome[:] = state.positions
+        return fitness
 
     def run(self) -> None:
+        try:
+            self.run_generations()
+        finally:
+            if self.parallel_evaluator:
+                self.parallel_evaluator.close()
+
+    def run_generations(self) -> None:
+        self.start_timer()
         self.initialize_population()
+        self.update_best()
         iterations_without_improvement = 0
         for i in range(self.generations):
+            if self.is_budget_exhausted():
+                break
             print(f"Generation {i}")
             if was_improved := self.run_iteration():
                 iterations_without_improvement = 0
@@ -115,17 +200,17 @@ class GAOptimizer(BaseOptimizer):
                 iterations_without_improvement += 1
 
             if iterations_without_improvement > self.iterations_without_improvement_stop_threshold:
+                if self.handle_stagnation():
+                    iterations_without_improvement = 0
+                    continue
                 print("Stopping due to algorithm stagnation")
                 break
+        self.print_run_summary()
 
-        final_timetable = self.get_timetable_from_best_solution()
-
-        print(final_timetable.to_str_full())
-
-        groups = self.course_manager.get_classes_group_dict_from_solution(self.best_solution)
-        print(json.dumps({str(k): v for k, v in groups.items()}, indent=4, default=str, ensure_ascii=False))
+        self.print_best_solution()
 
-        print("All time best", self.best_fitness, self.best_solution)
-        # print(json.dumps(final_timetable.to_ui_format(), indent=4, default=str, ensure_ascii=False))
-        print(self.course_manager.cache_hits, "cache hits")
+    def print_best_solution(self) -> None:
+        super().print_best_solution()
+        if not self.show_solution:
+            return
         print(self.course_manager.calculate_possible_solutions(), "possible solutions")
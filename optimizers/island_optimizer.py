@@ -0,0 +1,161 @@
+import multiprocessing
+import queue
+import random
+from typing import Optional, Union
+
+import numpy as np
+
+from models.course import Course
+from models.course_manager import CourseManager
+from optimizers.base_optimizer import BaseOptimizer
+from optimizers.ga_optimizer import GAOptimizer
+from optimizers.migration import Migrant, MigrationTransport, QueueTransport, SocketTransport
+
+Topology = Union[str, dict[int, list[int]]]  # 'ring', 'fully_connected' or island -> islands receiving its migrants
+
+
+def get_neighbours(island: int, islands: int, topology: Topology) -> list[int]:
+    if isinstance(topology, dict):
+        return topology.get(island, [])
+    if topology == 'ring':
+        return [(island + 1) % islands] if islands > 1 else []
+    if topology == 'fully_connected':
+        return [other for other in range(islands) if other != island]
+    raise ValueError(f"Unknown topology {topology}")
+
+
+def run_island(island: int, islands: int, courses: list[Course], ga_parameters: dict, migration_interval: int,
+               migration_size: int, topology: Topology, transport: MigrationTransport, results: multiprocessing.Queue,
+               seed: Optional[int] = None) -> None:
+    """
+    Runs GA of one island on courses loaded by the main process (config and catalog are not synchronized again),
+    sends best solutions to neighbours every migration_interval generations and replaces the worst individuals
+    with received migrants. New best solutions are reported to results,
+    None solution (with number of evaluations instead of fitness) means the island has finished.
+    """
+    random.seed(None if seed is None else seed + island)  # forked islands would share the random state
+    transport.open(island)
+    evaluations = 0
+    try:
+        ga = GAOptimizer(**ga_parameters, course_manager=CourseManager(courses=courses))
+        ga.start_timer()
+        ga.initialize_population()
+        ga.update_best()
+        results.put((island, ga.best_solution, ga.best_fitness))
+        iterations_without_improvement = 0
+        for generation in range(1, ga.generations + 1):
+            if ga.is_budget_exhausted():
+                break
+            if ga.run_iteration():
+                iterations_without_improvement = 0
+                results.put((island, ga.best_solution, ga.best_fitness))
+            else:
+                iterations_without_improvement += 1
+            if generation % migration_interval == 0:
+                migrants = [(ga.get_solution(index), float(ga.population.fitness[index]))
+                            for index in ga.population.get_best_indices(migration_size).tolist()]
+                for neighbour in get_neighbours(island, islands, topology):
+                    transport.send(neighbour, migrants)
+            if immigrants := transport.receive(island):
+                accept_migrants(ga, immigrants)
+            if iterations_without_improvement > ga.iterations_without_improvement_stop_threshold:
+                if ga.handle_stagnation():
+                    iterations_without_improvement = 0
+                    continue
+                print(f"Island {island} stopping due to algorithm stagnation")
+                break
+        evaluations = ga.evaluations
+    finally:
+        transport.close()
+        results.put((island, None, evaluations))
+
+
+def accept_migrants(ga: GAOptimizer, migrants: list[Migrant]) -> None:
+    """Replaces the worst individuals of population with migrants (fitness comes with them)"""
+    indices = ga.population.get_worst_indices(len(migrants))
+    migrants = migrants[:len(indices)]
+    ga.population.genomes[indices] = [ga.course_manager.get_positions(list(solution)) for solution, _ in migrants]
+    ga.population.fitness[indices] = np.array([fitness for _, fitness in migrants], dtype=np.float64)
+
+
+class IslandOptimizer(BaseOptimizer):
+    """
+    Island model GA - every island evolves its own population (of population_size) in a separate process,
+    best individuals migrate to neighbouring islands every migration_interval generations.
+    Transport is 'queue' (multiprocessing queues), 'socket' (local multiprocessing.connection sockets)
+    or any MigrationTransport. Islands are local processes started by run, they get courses of course_manager.
+    """
+
+    def __init__(self, islands: int, population_size: int, mutation_probability: float,
+                 crossover_probability: float, generations: int, elite_percentage: float,
+                 migration_interval: int = 5, migration_size: int = 5, topology: Topology = 'ring',
+                 transport: Union[str, MigrationTransport] = 'queue', seed: Optional[int] = None,
+                 course_manager: CourseManager = None, time_limit: float = None, target_fitness: float = None):
+        super().__init__(course_manager, time_limit, target_fitness)
+        self.islands: int = islands
+        # every island stops on its own when time limit or target fitness is reached
+        self.ga_parameters: dict = dict(population_size=population_size, mutation_probability=mutation_probability,
+                                        crossover_probability=crossover_probability, generations=generations,
+                                        elite_percentage=elite_percentage, time_limit=time_limit,
+                                        target_fitness=target_fitness)
+        self.migration_interval: int = migration_interval
+        self.migration_size: int = migration_size
+        self.topology: Topology = topology
+        for island in range(islands):
+            get_neighbours(island, islands, topology)  # validate topology before starting processes
+        if transport == 'queue':
+            transport = QueueTransport(islands)
+        elif transport == 'socket':
+            transport = SocketTransport.local(islands)
+        elif not isinstance(transport, MigrationTransport):
+            raise ValueError(f"Unknown transport {transport}")
+        self.transport: MigrationTransport = transport
+        self.seed: Optional[int] = seed
+        self.results: multiprocessing.Queue = multiprocessing.Queue()
+        self.processes: list[multiprocessing.Process] = []
+        self.finished_islands: set[int] = set()
+
+    def run_iteration(self) -> bool:
+        """Handles one report from islands, returns true if it improved the best solution"""
+        try:
+            island, solution, fitness = self.results.get(timeout=1)
+        except queue.Empty:
+            for island, process in enumerate(self.processes):
+                if not process.is_alive() and island not in self.finished_islands:
+                    print(f"Island {island} exited with code {process.exitcode}")
+                    self.finished_islands.add(island)
+            return False
+        if solution is None:
+            self.finished_islands.add(island)
+            self.evaluations += fitness  # finished island reports its number of evaluations
+            return False
+        if fitness > self.best_fitness:
+            self.best_fitness = fitness
+            self.best_solution = solution
+            print(f"New best solution found on island {island}", self.best_fitness, self.best_solution)
+            return True
+        return False
+
+    def run(self) -> None:
+        self.start_timer()
+        self.finished_islands = set()
+        self.processes = [multiprocessing.Process(
+            target=run_island, args=(island, self.islands, self.course_manager.courses, self.ga_parameters,
+                                     self.migration_interval, self.migration_size, self.topology, self.transport,
+                                     self.results, self.seed))
+            for island in range(self.islands)]
+        for process in self.processes:
+            process.start()
+        while len(self.finished_islands) < self.islands:
+            self.run_iteration()
+            if self.is_budget_exhausted():
+                break
+        for process in self.processes:
+            if process.is_alive() and self.is_budget_exhausted():
+                process.terminate()  # islands check budget only between generations
+            process.join()
+        self.print_run_summary()
+        if not self.best_solution:
+            raise RuntimeError("No island has finished successfully")
+
+        self.print_best_solution()
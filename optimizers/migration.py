@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+from abc import ABC, abstractmethod
+from multiprocessing.connection import Client, Listener
+from typing import Optional
+
+Migrant = tuple[list[int], float]  # solution and its fitness
+
+
+class MigrationTransport(ABC):
+    """
+    Sends migrating individuals between islands of IslandOptimizer.
+    Transport is created in the parent process and passed to island processes, where open is called first.
+    """
+
+    def open(self, island: int) -> None:
+        pass
+
+    @abstractmethod
+    def send(self, island: int, migrants: list[Migrant]) -> None:
+        pass
+
+    @abstractmethod
+    def receive(self, island: int) -> list[Migrant]:
+        """Returns all migrants that arrived since last call, without waiting"""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class QueueTransport(MigrationTransport):
+    """Migration through multiprocessing queues, islands have to run on the same machine"""
+
+    def __init__(self, islands: int):
+        self.queues: list[multiprocessing.Queue] = [multiprocessing.Queue() for _ in range(islands)]
+
+    def send(self, island: int, migrants: list[Migrant]) -> None:
+        self.queues[island].put(migrants)
+
+    def receive(self, island: int) -> list[Migrant]:
+        migrants = []
+        while True:
+            try:
+                migrants.extend(self.queues[island].get_nowait())
+            except queue.Empty:
+                return migrants
+
+
+class SocketTransport(MigrationTransport):
+    """
+    Migration through multiprocessing.connection sockets, every island listens on its own local address
+    (open binds it in the island process, so addresses have to belong to the machine running the islands).
+    Migrants sent to an island that is not listening (e.g. already finished) are dropped.
+    """
+
+    def __init__(self, addresses: list[tuple[str, int]], authkey: bytes = None):
+        self.addresses: list[tuple[str, int]] = addresses
+        self.authkey: bytes = authkey or os.urandom(16)
+        self._listener: Optional[Listener] = None
+        self._inbox: queue.Queue = queue.Queue()
+
+    @classmethod
+    def local(cls, islands: int, host: str = '127.0.0.1') -> 'SocketTransport':
+        """Transport with free local ports for given number of islands"""
+        addresses = []
+        for _ in range(islands):
+            with socket.socket() as free_socket:
+                free_socket.bind((host, 0))
+                addresses.append((host, free_socket.getsockname()[1]))
+        return cls(addresses)
+
+    def __getstate__(self) -> dict:
+        return dict(addresses=self.addresses, authkey=self.authkey)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['addresses'], state['authkey'])
+
+    def open(self, island: int) -> None:
+        self._listener = Listener(self.addresses[island], authkey=self.authkey)
+        threading.Thread(target=self._accept_connections, args=(self._listener,), daemon=True).start()
+
+    def _accept_connections(self, listener: Listener) -> None:
+        while True:
+            try:
+                with listener.accept() as connection:
+                    self._inbox.put(connection.recv())
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                if self._listener is not listener:  # closed
+                    return
+
+    def send(self, island: int, migrants: list[Migrant]) -> None:
+        try:
+            with Client(self.addresses[island], authkey=self.authkey) as connection:
+                connection.send(migrants)
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            pass
+
+    def receive(self, island: int) -> list[Migrant]:
+        migrants = []
+        while True:
+            try:
+                migrants.extend(self._inbox.get_nowait())
+            except queue.Empty:
+                return migrants
+
+    def close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
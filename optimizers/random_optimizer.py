@@ -1,16 +1,15 @@
-import json
-
 from optimizers.base_optimizer import BaseOptimizer
 
 
 class RandomOptimizer(BaseOptimizer):
-    def __init__(self, iterations):
-        super().__init__()
+    def __init__(self, iterations, time_limit: float = None, target_fitness: float = None):
+        super().__init__(time_limit=time_limit, target_fitness=target_fitness)
         self.iterations: int = iterations
 
     def run_iteration(self) -> bool:
         solution = self.generate_random_solution()
         fitness = self.course_manager.rate_solution(solution)
+        self.evaluations += 1
         if fitness > self.best_fitness:
             self.best_fitness = fitness
             self.best_solution = solution
@@ -20,13 +19,10 @@ class RandomOptimizer(BaseOptimizer):
             return False
 
     def run(self) -> None:
+        self.start_timer()
         for i in range(self.iterations):
             self.run_iteration()
-        final_timetable = self.get_timetable_from_best_solution()
-
-        print(final_timetable.to_str_full())
-
-        groups = self.course_manager.get_classes_group_dict_from_solution(self.best_solution)
-        print(json.dumps(groups, indent=4, default=str, ensure_ascii=False))
-
-        print("All time best", self.best_fitness, self.best_solution)
+            if self.is_budget_exhausted():
+                break
+        self.print_run_summary()
+        self.print_best_solution()
@@ -1,12 +1,212 @@
+import contextlib
+import io
+import json
+import itertools
+import os
+import random
+import tempfile
+import time
 import unittest
+from collections import Counter
 from datetime import timedelta
 
+import numpy as np
+import requests
+
 from config.config_manager import ConfigManager
+from models.batch_evaluator import BatchEvaluator
+from models.catalog import Catalog
+from models.catalog_bundle import CatalogBundle, CatalogEntry
+from models.course import Course
+from models.course_manager import CourseManager
+from models.meeting import Meeting
+from models.parallel_evaluator import ParallelEvaluator
+from models.solution_state import SolutionState
+from optimizers.annealing_optimizer import AnnealingOptimizer
+from optimizers.array_population import ArrayPopulation
+from optimizers.auto_optimizer import select_optimizer
+from optimizers.decomposed_optimizer import DecomposedOptimizer
+from optimizers.exact_optimizer import ExactOptimizer
 from optimizers.ga_optimizer import GAOptimizer
+from optimizers.island_optimizer import IslandOptimizer, get_neighbours
+from optimizers.migration import QueueTransport, SocketTransport
+from utils.fitness_cache import FitnessCache
+from utils.launcher import find_timetable
+from utils.response_cache import ResponseCache
+from utils.scraper import Scraper
+from utils.transport import TokenBucket, Transport
 
 unittest.TestLoader.sortTestMethodsUsing = None
 
 
+def make_course(course_index: int, groups: list[tuple[int, str, str]], weeks: tuple[int, ...] = (0, 7)) -> Course:
+    """Lecture with groups given as (day of October 2024, start, end), meeting on the same day of given weeks"""
+    course = Course(f"W04IST-SI082{course_index}G", f"Kurs {course_index}", course_unit_id=course_index)
+    course.update_type("Lecture")
+    for group_id, (day, start, end) in enumerate(groups, 1):
+        course.add_group(group_id, [{"start_time": f"2024-10-{day + week:02d} {start}:00",
+                                     "end_time": f"2024-10-{day + week:02d} {end}:00"} for week in weeks],
+                         "Jan Kowalski", "Lecture")
+    return course
+
+
+class FakeUsosSession:
+    """
+    Answers USOS API requests of Scraper offline and records them.
+    Courses are given as course id -> unit id -> (class type id, group numbers), meetings are made up.
+    """
+    class_types: dict[str, str] = {"1": "Lecture", "2": "Classes"}
+
+    def __init__(self, courses: dict[str, dict[int, tuple[str, list[float]]]]):
+        self.courses: dict[str, dict[int, tuple[str, list[float]]]] = courses
+        self.calls: list[tuple[str, dict]] = []
+
+    def get_edition(self, course_id: str) -> dict:
+        return dict(course_id=course_id, course_name={'pl': f"Kurs {course_id}"}, lecturers=[],
+                    course_units_ids=[str(unit_id) for unit_id in self.courses[course_id]])
+
+    def get_unit(self, unit_id: str) -> dict:
+        class_type_id, groups = next(units[int(unit_id)] for units in self.courses.values() if int(unit_id) in units)
+        return dict(id=unit_id, classtype_id=class_type_id, class_groups=[dict(number=group) for group in groups])
+
+    def get_body(self, endpoint: str, params: dict) -> any:
+        if endpoint == 'courses/course_editions':
+            return {course_id: self.get_edition(course_id) for course_id in params['course_ids'].split('|')}
+        if endpoint == 'courses/course_edition':
+            return self.get_edition(params['course_id'])
+        if endpoint == 'courses/units':
+            return {unit_id: self.get_unit(unit_id) for unit_id in params['unit_ids'].split('|')}
+        if endpoint == 'courses/course_unit':
+            return self.get_unit(str(params['course_unit_id']))
+        if endpoint == 'courses/classtypes_index':
+            return {class_type_id: dict(name={'en': name}) for class_type_id, name in self.class_types.items()}
+        if endpoint == 'tt/classgroup_dates2':
+            class_type = self.class_types[self.get_unit(str(params['unit_id']))['classtype_id']]
+            day = int(params['group_number'])
+            return [dict(start_time=f"2024-10-0{day} 08:00:00", end_time=f"2024-10-0{day} 09:30:00",
+                         classtype_name={'en': class_type}, lecturer_ids=[])]
+        raise ValueError(f"Unknown endpoint {endpoint}")
+
+    def get(self, url, params=None, **kwargs):
+        endpoint = url.split('/services/')[1]
+        self.calls.append((endpoint, params))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(self.get_body(endpoint, params)).encode('utf-8')
+        return response
+
+
+class FakeUsosTestCase(unittest.TestCase):
+    """Scraper talks to FakeUsosSession, its responses (and catalog bundle) are cached in a temporary directory"""
+    courses: dict[str, dict[int, tuple[str, list[float]]]] = {
+        "W04IST-SI0001G": {11: ("1", [1.0]), 12: ("2", [1.0, 2.0, 3.0])},
+        "W04IST-SI0002G": {21: ("1", [1.0, 2.0])},
+    }
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.session = FakeUsosSession(self.courses)
+        self.config_manager = ConfigManager()
+        self.original_config = (self.config_manager.config, self.config_manager.test_mode)
+        self.config_manager.config = {
+            "term": "2024/25-Z", "courses": [{"id": course_id, "blacklistedGroups": {"Lecture": [], "Classes": []}}
+                                             for course_id in self.courses],
+            "travelTimes": [{"time": 10, "hourStart": 0, "hourEnd": 24}]}
+        self.config_manager.test_mode = True
+
+    def tearDown(self):
+        self.config_manager.config, self.config_manager.test_mode = self.original_config
+        self.directory.cleanup()
+
+    def get_scraper(self) -> Scraper:
+        scraper = Scraper(cache=ResponseCache(directory=os.path.join(self.directory.name, 'usos')))
+        scraper.transport._session = self.session
+        return scraper
+
+    def get_calls(self) -> Counter:
+        calls = Counter(endpoint for endpoint, _ in self.session.calls)
+        self.session.calls = []
+        return calls
+
+
+class ScraperTests(FakeUsosTestCase):
+    def test_batched_requests_and_cache(self):
+        course_ids = list(self.courses)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            courses = self.get_scraper().get_courses_info(course_ids)
+        self.assertIn("courses/course_editions: 1 requests, 0 errors, 0 retries", output.getvalue())
+        self.assertEqual([(course.raw_id, course.type, [group['group_id'] for group in course.groups])
+                          for course in courses],
+                         [("W04IST-SI0001G", "Lecture", [1]), ("W04IST-SI0001G", "Classes", [1, 2, 3]),
+                          ("W04IST-SI0002G", "Lecture", [1, 2])])
+        # one multi-id request per stage, class types are not needed without blacklisted groups
+        self.assertEqual(self.get_calls(), {'courses/course_editions': 1, 'courses/units': 1,
+                                            'tt/classgroup_dates2': 6})
+
+        self.get_scraper().get_courses_info(course_ids[:1])  # objects are cached per id
+        self.assertEqual(self.get_calls(), {})
+        self.assertEqual([str(course) for course in self.get_scraper().get_courses_info(course_ids)],
+                         [str(course) for course in courses])
+        self.assertEqual(self.get_calls(), {})
+
+    def test_blacklisted_groups_are_not_fetched(self):
+        self.config_manager.config['courses'][0]['blacklistedGroups']['Classes'] = [2]  # USOS returns 2.0
+        course_ids = list(self.courses)
+        courses = self.get_scraper().get_courses_info(course_ids)
+        self.assertEqual([[group['group_id'] for group in course.groups] for course in courses], [[1], [1, 3], [1, 2]])
+        fetched_groups = [(str(params['unit_id']), float(params['group_number'])) for endpoint, params
+                          in self.session.calls if endpoint == 'tt/classgroup_dates2']
+        self.assertEqual(sorted(fetched_groups), [('11', 1), ('12', 1), ('12', 3), ('21', 1), ('21', 2)])
+        self.assertEqual(self.get_calls()['courses/classtypes_index'], 1)  # class type of unit is resolved by id
+
+
+class CourseSyncTests(FakeUsosTestCase):
+    def load_course_manager(self) -> CourseManager:
+        course_manager = CourseManager(courses=[])
+        course_manager.scraper = self.get_scraper()
+        course_manager.bundle = CatalogBundle(directory=os.path.join(self.directory.name, 'catalog'))
+        course_manager.load_courses()
+        return course_manager
+
+    def set_blacklisted_classes(self, groups: list[int]) -> None:
+        self.config_manager.config['courses'][0]['blacklistedGroups']['Classes'] = groups
+
+    def test_unchanged_config(self):
+        self.load_course_manager()
+        self.assertEqual(sum(self.get_calls().values()), 8)
+        course_manager = self.load_course_manager()
+        self.assertEqual(self.get_calls(), {})
+        self.assertEqual(course_manager.catalog.group_ids, [[1], [1, 2, 3], [1, 2]])
+
+    def test_newly_blacklisted_group(self):
+        self.load_course_manager()
+        self.get_calls()
+        self.set_blacklisted_classes([3])
+        course_manager = self.load_course_manager()
+        self.assertEqual(self.get_calls(), {})  # removed locally
+        self.assertEqual(course_manager.catalog.group_ids, [[1], [1, 2], [1, 2]])
+
+    def test_unblacklisted_group(self):
+        self.set_blacklisted_classes([2])
+        self.load_course_manager()
+        self.get_calls()
+        self.set_blacklisted_classes([])
+        course_manager = self.load_course_manager()
+        # the course is scraped again, but only meetings of the group skipped before are not in response cache
+        self.assertEqual([(endpoint, params['unit_id'], params['group_number']) for endpoint, params in
+                          self.session.calls], [('tt/classgroup_dates2', '12', 2)])
+        self.assertEqual(course_manager.catalog.group_ids, [[1], [1, 2, 3], [1, 2]])
+
+    def test_removed_course(self):
+        self.load_course_manager()
+        self.get_calls()
+        self.config_manager.config['courses'].pop()
+        course_manager = self.load_course_manager()
+        self.assertEqual(self.get_calls(), {})
+        self.assertEqual([course.raw_id for course in course_manager.courses], ["W04IST-SI0001G"] * 2)
+        self.assertEqual(list(course_manager.bundle.load("2024/25-Z")), ["W04IST-SI0001G"])
+
+
 def run_optimizer_without_ui():
     ga = GAOptimizer(population_size=2800, mutation_probability=0.015, crossover_probability=0.6, generations=90,
                      elite_percentage=5)
@@ -73,5 +273,449 @@ class Tests(unittest.TestCase):
                          {x: timedelta(minutes=0) for x in range(24)})
 
 
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(directory=self.directory.name, ttls={'tt/classgroup_dates2': 60})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_contains_term_and_params(self):
+        key = self.cache.make_key('courses/course_unit', dict(course_unit_id=1), '2024/25-Z')
+        self.assertEqual(key, self.cache.make_key('courses/course_unit', dict(course_unit_id=1), '2024/25-Z'))
+        self.assertNotEqual(key, self.cache.make_key('courses/course_unit', dict(course_unit_id=1), '2024/25-L'))
+        self.assertNotEqual(key, self.cache.make_key('courses/course_unit', dict(course_unit_id=2), '2024/25-Z'))
+
+    def test_ttl_and_revalidation_headers(self):
+        self.cache.put('key', [1, 2, 3], etag='"abc"')
+        entry = self.cache.get('key')
+        self.assertEqual(entry['body'], [1, 2, 3])
+        self.assertTrue(self.cache.is_fresh('tt/classgroup_dates2', entry))
+        entry['stored_at'] = time.time() - 120
+        self.assertFalse(self.cache.is_fresh('tt/classgroup_dates2', entry))
+        self.assertEqual(self.cache.get_revalidation_headers(entry), {'If-None-Match': '"abc"'})
+
+    def test_lru_eviction(self):
+        self.cache.put('key0', [0])
+        self.cache.max_size = 3 * self.cache.get_size() + self.cache.get_size() // 2  # room for 3 entries
+        for i in range(1, 3):
+            self.cache.put(f'key{i}', [i])
+            time.sleep(0.01)
+        self.cache.get('key0')
+        self.cache.put('key3', [3])
+        self.assertIsNotNone(self.cache.get('key0'))
+        self.assertIsNone(self.cache.get('key1'))
+        self.assertIsNotNone(self.cache.get('key3'))
+
+
+class TransportTests(unittest.TestCase):
+    class FakeSession:
+        def __init__(self, results):
+            self.results = list(results)  # status codes or exceptions, in order of requests
+            self.calls = 0
+
+        def get(self, url, **kwargs):
+            self.calls += 1
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            response = requests.Response()
+            response.status_code = result
+            return response
+
+    def get_transport(self, results, max_retries=2):
+        transport = Transport('http://usos', max_retries=max_retries, backoff_base=0.001, requests_per_second=1000)
+        transport._session = self.FakeSession(results)
+        return transport
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        start_time = time.monotonic()
+        for _ in range(7):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start_time, 5 / 50 * 0.9)  # burst of 2, then 50 per second
+
+    def test_backoff(self):
+        transport = Transport('http://usos', backoff_base=0.5, backoff_max=8)
+        for attempt in range(10):
+            self.assertTrue(0 <= transport.get_backoff_time(attempt) <= min(8, 0.5 * 2 ** attempt))
+
+    def test_retries(self):
+        transport = self.get_transport([503, requests.ConnectionError(), 200])
+        self.assertEqual(transport.get('endpoint', {}).status_code, 200)
+        self.assertEqual((transport.stats['endpoint'].retries, transport.stats['endpoint'].errors), (2, 2))
+        self.assertEqual(self.get_transport([404]).get('endpoint', {}).status_code, 404)  # not retried
+        self.assertEqual(self.get_transport([503, 503, 503]).get('endpoint', {}).status_code, 503)
+        with self.assertRaises(requests.Timeout):
+            self.get_transport([requests.Timeout()] * 3).get('endpoint', {})
+
+
+class FitnessCacheTests(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = FitnessCache(max_entries=2, policy='lru')
+        cache.put((1,), 0.5)
+        cache.put((2,), 0)
+        self.assertEqual(cache.get((1,)), 0.5)
+        cache.put((3,), 0.25)
+        self.assertIsNone(cache.get((2,)))
+        self.assertEqual(cache.get((3,)), 0.25)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions, len(cache)), (2, 1, 1, 2))
+
+    def test_lfu_eviction(self):
+        cache = FitnessCache(max_entries=2, policy='lfu')
+        cache.put((1,), 0.5)
+        cache.put((2,), 0)
+        cache.get((1,))
+        cache.get((1,))
+        cache.get((2,))
+        cache.put((3,), 0.25)
+        cache.put((4,), 0.125)
+        self.assertEqual(cache.get((1,)), 0.5)
+        self.assertNotIn((2,), cache)
+        self.assertNotIn((3,), cache)
+        self.assertEqual(cache.get((4,)), 0.125)
+        self.assertEqual(cache.evictions, 2)
+
+
+class MigrationTests(unittest.TestCase):
+    def receive(self, transport, island):
+        deadline = time.time() + 5
+        while not (migrants := transport.receive(island)) and time.time() < deadline:
+            time.sleep(0.01)
+        return migrants
+
+    def test_queue_transport(self):
+        transport = QueueTransport(2)
+        transport.send(1, [([1, 2], 0.5)])
+        self.assertEqual(self.receive(transport, 1), [([1, 2], 0.5)])
+        self.assertEqual(transport.receive(0), [])
+
+    def test_socket_transport(self):
+        transport = SocketTransport.local(2)
+        transport.open(0)
+        try:
+            transport.send(0, [([1, 2], 0.5)])
+            transport.send(1, [([3, 4], 0.25)])  # island 1 is not listening, migrants are dropped
+            self.assertEqual(self.receive(transport, 0), [([1, 2], 0.5)])
+        finally:
+            transport.close()
+
+    def test_topology(self):
+        self.assertEqual(get_neighbours(2, 3, 'ring'), [0])
+        self.assertEqual(get_neighbours(1, 3, 'fully_connected'), [0, 2])
+        self.assertEqual(get_neighbours(1, 3, {0: [1]}), [])
+        self.assertRaises(ValueError, get_neighbours, 0, 3, 'star')
+
+
+class CatalogBundleTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.bundle = CatalogBundle(directory=self.directory.name)
+        self.course = make_course(7, [(1, "07:30", "09:00")])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.bundle.save("2024/25-Z", {"W04IST-SI0827G": CatalogEntry([self.course], {})})
+        course, = self.bundle.load("2024/25-Z")["W04IST-SI0827G"].courses
+        self.assertEqual(course.main_id, self.course.main_id)
+        self.assertEqual(course.type, "Lecture")
+        self.assertEqual([str(meet) for meet in course.get_all_meetings_for_group(1)],
+                         [str(meet) for meet in self.course.get_all_meetings_for_group(1)])
+
+    def test_outdated_entries(self):
+        self.bundle.save("2024/25-Z", {"W04IST-SI0827G": CatalogEntry([self.course], {}),
+                                       "W04IST-SI0828G": CatalogEntry([self.course], {}, fetched_at=1)})
+        self.assertEqual(list(self.bundle.load("2024/25-Z")), ["W04IST-SI0827G"])
+        self.assertEqual(self.bundle.load("2024/25-L"), {})
+
+
+class MeetingTests(unittest.TestCase):
+    def test_parse_times(self):
+        self.assertEqual(Meeting.parse_times("2024-10-01 07:30:00", "2024-10-01 09:00:00"),
+                         (Meeting.convert_to_datetime("2024-10-01 07:30:00").toordinal(), 450, 540))
+        day, start, end = Meeting.parse_times("2024-12-31 23:15:00", "2025-01-01 00:45:00")
+        self.assertEqual((start, end), (1395, 1485))
+
+
+class EvaluationTests(unittest.TestCase):
+    def setUp(self):
+        self.courses = [make_course(0, [(1, "08:00", "09:00"), (1, "12:00", "13:00")]),
+                        make_course(1, [(1, "09:00", "10:00"), (1, "10:00", "11:00")]),
+                        make_course(2, [(1, "09:30", "10:30"), (1, "15:00", "16:00")])]
+        self.catalog = Catalog(self.courses, [10] * 24)
+
+    def get_fitness(self, positions: list[int]) -> float:
+        if self.catalog.get_overlaps(positions) > 1:
+            return 0
+        return 1 / self.catalog.get_total_minutes(positions)
+
+    def test_change_matches_full_evaluation(self):
+        state = SolutionState(self.catalog, [0, 0, 0])
+        self.assertEqual(state.get_fitness(), 0)  # 9:00 - 10:00 overlaps with both neighbours on both days
+        for course_index, position in [(2, 1), (0, 1), (1, 1), (2, 0)]:
+            positions = list(state.positions)
+            positions[course_index] = position
+            self.assertEqual(state.get_changed_fitness(course_index, position), self.get_fitness(positions))
+            state.change(course_index, position)
+            self.assertEqual(state.get_fitness(), self.get_fitness(positions))
+            self.assertEqual(state.total_minutes, SolutionState(self.catalog, positions).total_minutes)
+
+    def test_batch_matches_full_evaluation(self):
+        batch = [[first, second, third] for first in range(2) for second in range(2) for third in range(2)]
+        self.assertEqual(BatchEvaluator(self.catalog).rate_positions(batch).tolist(),
+                         [self.get_fitness(positions) for positions in batch])
+
+    def test_parallel_matches_batch_evaluation(self):
+        batch = np.random.default_rng(0).integers(0, 2, size=(4 * ParallelEvaluator.min_chunk_size, 3))
+        evaluator = BatchEvaluator(self.catalog)
+        parallel_evaluator = ParallelEvaluator(evaluator, workers=2)
+        try:
+            self.assertEqual(parallel_evaluator.rate_positions(batch).tolist(),
+                             evaluator.rate_positions(batch).tolist())
+            self.assertIsNotNone(parallel_evaluator._executor)  # batch was large enough to be split between workers
+        finally:
+            parallel_evaluator.close()
+
+    def test_shared_parallel_evaluator(self):
+        batch = np.random.default_rng(0).integers(0, 2, size=(4 * ParallelEvaluator.min_chunk_size, 3))
+        evaluators = [BatchEvaluator(self.catalog), BatchEvaluator(Catalog(self.courses))]
+        parallel_evaluator = ParallelEvaluator(evaluators, workers=2)
+        try:
+            executors = []
+            for evaluator_index, evaluator in enumerate(evaluators):
+                shared_evaluator = parallel_evaluator.get_shared(evaluator_index)
+                self.assertEqual(shared_evaluator.rate_positions(batch).tolist(),
+                                 evaluator.rate_positions(batch).tolist())
+                shared_evaluator.close()
+                executors.append(parallel_evaluator._executor)
+            self.assertIsNotNone(executors[0])
+            self.assertIs(executors[0], executors[1])  # closing shared evaluator keeps the pool running
+        finally:
+            parallel_evaluator.close()
+
+
+class DecompositionTests(unittest.TestCase):
+    def test_components_and_allowed_overlaps(self):
+        courses = [make_course(0, [(1, "08:00", "09:00"), (1, "08:30", "09:30")], weeks=(0,)),
+                   make_course(1, [(2, "10:00", "11:00")], weeks=(0,)),
+                   make_course(2, [(1, "09:15", "10:15")], weeks=(0,))]
+        self.assertEqual(Catalog(courses).get_course_components(), [[0, 2], [1]])
+        for max_overlaps in (0, 1):
+            catalog = Catalog(courses, max_overlaps=max_overlaps)
+            # 8:30 - 9:30 group of the first course overlaps with the third course
+            expected = [1 / catalog.get_total_minutes([0, 0, 0]),
+                        1 / catalog.get_total_minutes([1, 0, 0]) if max_overlaps else 0]
+            self.assertEqual(BatchEvaluator(catalog).rate_positions([[0, 0, 0], [1, 0, 0]]).tolist(), expected)
+            self.assertEqual(SolutionState(catalog, [0, 0, 0]).get_changed_fitness(0, 1), expected[1])
+        with self.assertRaises(ValueError):
+            Catalog(courses, max_overlaps=2)
+
+
+class OptimizerTests(unittest.TestCase):
+    @staticmethod
+    def get_course_manager(seed: int, courses_count: int = 5, max_groups: int = 4,
+                           same_day: bool = False) -> CourseManager:
+        """Random courses meeting on two days of two weeks (all groups of a course on one day if same_day)"""
+        rng = random.Random(seed)
+        courses = []
+        for course_index in range(courses_count):
+            days = [course_index % 2 + 1] if same_day else [1, 2]
+            groups = []
+            for _ in range(rng.randint(1, max_groups)):
+                day, hour = rng.choice(days), rng.randint(8, 16)
+                groups.append((day, f"{hour}:15", f"{hour + 1}:45"))
+            courses.append(make_course(course_index, groups))
+        return CourseManager(courses=courses)
+
+    @staticmethod
+    def run_quietly(optimizer) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer.run()
+
+    def test_exact_matches_brute_force(self):
+        for seed in range(10):
+            course_manager = self.get_course_manager(seed)
+            best_fitness = max(course_manager.rate_solution(list(solution))
+                               for solution in itertools.product(*course_manager.catalog.group_ids))
+            optimizer = ExactOptimizer(course_manager)
+            self.run_quietly(optimizer)
+            self.assertTrue(optimizer.is_optimal)
+            self.assertEqual(optimizer.best_fitness, best_fitness)
+            if best_fitness:
+                self.assertEqual(course_manager.rate_solution(optimizer.best_solution), best_fitness)
+
+    def test_annealing(self):
+        random.seed(0)
+        course_manager = self.get_course_manager(0)
+        optimizer = AnnealingOptimizer(iterations=2000, course_manager=course_manager)
+        self.run_quietly(optimizer)
+        self.assertGreater(optimizer.best_fitness, 0)
+        self.assertEqual(course_manager.rate_solution(optimizer.best_solution), optimizer.best_fitness)
+
+        course_manager = self.get_course_manager(0, courses_count=2, max_groups=1)  # no course can change its group
+        optimizer = AnnealingOptimizer(course_manager=course_manager)
+        self.run_quietly(optimizer)
+        self.assertEqual(optimizer.best_solution, [1, 1])
+        self.assertEqual(optimizer.best_fitness, course_manager.rate_solution([1, 1]))
+
+    def test_solution_change(self):
+        course_manager = self.get_course_manager(0)
+        solution = [group_ids[0] for group_ids in course_manager.catalog.group_ids]
+        state = course_manager.get_solution_state(solution)
+        for course_index, group_ids in enumerate(course_manager.catalog.group_ids):
+            for group_id in group_ids:
+                changed_solution = solution[:course_index] + [group_id] + solution[course_index + 1:]
+                self.assertEqual(course_manager.rate_solution_change(state, course_index, group_id),
+                                 course_manager.rate_solution(changed_solution))
+        course_manager.apply_solution_change(state, 0, course_manager.catalog.group_ids[0][-1])
+        self.assertEqual(course_manager.get_solution_from_state(state)[0], course_manager.catalog.group_ids[0][-1])
+        for change in (course_manager.rate_solution_change, course_manager.apply_solution_change):
+            self.assertRaises(ValueError, change, state, 0, 99)
+
+    def test_decomposed_matches_brute_force(self):
+        for seed in range(10):
+            course_manager = self.get_course_manager(seed, 6, 3, same_day=True)
+            best_fitness = max(course_manager.rate_solution(list(solution))
+                               for solution in itertools.product(*course_manager.catalog.group_ids))
+            optimizer = DecomposedOptimizer(select_optimizer, course_manager)
+            self.run_quietly(optimizer)
+            self.assertEqual(len(optimizer.components), 2)
+            self.assertEqual(optimizer.best_fitness, best_fitness)
+            if best_fitness:
+                self.assertEqual(course_manager.rate_solution(optimizer.best_solution), best_fitness)
+
+    def test_decomposed_anytime(self):
+        # both components need their overlap, so they are searched again without overlaps after the first pass
+        courses = [make_course(course_index, [(day, start, end)], weeks=(0,))
+                   for course_index, (day, start, end) in enumerate([(1, "08:00", "09:30"), (1, "09:00", "10:30"),
+                                                                     (2, "08:00", "09:30"), (2, "09:00", "10:30")])]
+        course_manager = CourseManager(courses=courses)
+        directory = tempfile.TemporaryDirectory()
+        working_directory = os.getcwd()
+        os.chdir(directory.name)  # plans are saved to the working directory
+        try:
+            optimizer = DecomposedOptimizer(select_optimizer, course_manager, time_limit=0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertIsNone(find_timetable(optimizer))
+            self.assertEqual(optimizer.pending_runs, [(0, 1), (1, 1)])  # budget is checked before every component
+
+            optimizer = DecomposedOptimizer(select_optimizer, course_manager, time_limit=60)
+            run_component = optimizer.run_component
+
+            def run_component_in_first_pass(component: int, max_overlaps: int):
+                result = run_component(component, max_overlaps)
+                if not optimizer.pending_runs:
+                    optimizer.time_limit = 0  # budget runs out before searches without overlaps
+                return result
+
+            optimizer.run_component = run_component_in_first_pass
+            with contextlib.redirect_stdout(io.StringIO()):
+                timetable = find_timetable(optimizer)
+            self.assertEqual(optimizer.pending_runs, [(0, 0), (1, 0)])
+            self.assertEqual(optimizer.best_solution, [1, 1, 1, 1])  # fewest overlaps found, none without them
+            self.assertEqual(optimizer.best_fitness, 0)
+            self.assertTrue(os.path.exists(f"Timetables/{timetable.get_catalog_name()}/groups.csv"))
+        finally:
+            os.chdir(working_directory)
+            directory.cleanup()
+
+    def test_parallel_rating_rates_duplicates_once(self):
+        course_manager = self.get_course_manager(0)
+        rng = np.random.default_rng(0)
+        positions = np.stack([rng.integers(0, len(group_ids), 2 * ParallelEvaluator.min_chunk_size)
+                              for group_ids in course_manager.catalog.group_ids], axis=1)
+        positions = np.concatenate([positions, positions[::-1]])
+        parallel_evaluator = course_manager.get_parallel_evaluator(workers=2)
+        try:
+            self.assertEqual(course_manager.rate_positions_parallel(positions, parallel_evaluator).tolist(),
+                             course_manager.rate_positions(positions).tolist())
+        finally:
+            parallel_evaluator.close()
+
+    def test_islands(self):
+        course_manager = self.get_course_manager(0)
+        for transport in ('queue', 'socket'):
+            optimizer = IslandOptimizer(2, 40, 0.05, 0.8, 10, 10, migration_interval=2, transport=transport, seed=0,
+                                        course_manager=course_manager)
+            self.run_quietly(optimizer)
+            self.assertGreater(optimizer.best_fitness, 0)
+            self.assertEqual(course_manager.rate_solution(optimizer.best_solution), optimizer.best_fitness)
+            self.assertEqual(optimizer.finished_islands, {0, 1})
+            self.assertGreater(optimizer.evaluations, 0)
+
+    def test_ga_keeps_elite(self):
+        random.seed(0)
+        optimizer = GAOptimizer(50, 0.5, 0.8, 10, 10, course_manager=self.get_course_manager(1, 8),
+                                local_search_budget=0)
+        optimizer.initialize_population()
+        elite_indices = optimizer.population.get_best_indices(optimizer.elite_size)
+        elite = optimizer.population.genomes[elite_indices]
+        elite_fitness = optimizer.population.fitness[elite_indices]
+        optimizer.run_iteration()
+        self.assertTrue(np.array_equal(optimizer.population.genomes[:optimizer.elite_size], elite))
+        self.assertTrue(np.array_equal(optimizer.population.fitness[:optimizer.elite_size], elite_fitness))
+
+    def test_ga_local_optimization(self):
+        random.seed(0)
+        course_manager = self.get_course_manager(0)
+        optimizer = GAOptimizer(20, 0.05, 0.8, 10, 10, course_manager=course_manager)
+        optimizer.initialize_population()
+        for genome, fitness in zip(optimizer.population.genomes, optimizer.population.fitness.tolist()):
+            optimizer.local_search_evaluations = optimizer.local_search_budget
+            improved_fitness = optimizer.local_optimization(genome, fitness)
+            self.assertGreaterEqual(improved_fitness, fitness)
+            self.assertEqual(course_manager.rate_positions([genome]).tolist(), [improved_fitness])
+        self.assertEqual(len(course_manager.fitness_cache), 0)  # local search does not fill the cache
+
+    def test_ga_adapts_to_diversity(self):
+        random.seed(0)
+        optimizer = GAOptimizer(40, 0.02, 0.8, 10, 10, course_manager=self.get_course_manager(1, 8),
+                                local_search_budget=0)
+        optimizer.initialize_population()
+        optimizer.population.genomes[:] = optimizer.population.genomes[0]  # population collapsed to one genome
+        optimizer.adapt_parameters()
+        self.assertGreater(optimizer.mutation_probability, 0.02)
+        self.assertEqual(optimizer.tournament_size, optimizer.base_tournament_size - 1)
+
+        elite = optimizer.population.genomes[optimizer.population.get_best_indices(optimizer.elite_size)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(optimizer.handle_stagnation())
+        self.assertEqual((optimizer.mutation_probability, optimizer.tournament_size),
+                         (0.02, optimizer.base_tournament_size))
+        self.assertTrue(np.array_equal(optimizer.population.genomes[:optimizer.elite_size], elite))
+        self.assertGreater(optimizer.get_diversity()[0], 0.5)  # the rest is random again
+        optimizer.restarts = optimizer.max_restarts
+        self.assertFalse(optimizer.handle_stagnation())
+
+
+class ArrayPopulationTests(unittest.TestCase):
+    def setUp(self):
+        self.population = ArrayPopulation([3, 1, 4], np.random.default_rng(0))
+        self.population.genomes = self.population.get_random_genomes(50)
+        self.population.fitness = np.arange(50, dtype=np.float64) % 7
+
+    def test_operators_keep_valid_groups(self):
+        parents1, parents2 = self.population.select_parent_pairs(20, 4)
+        children, crossed = self.population.crossover(parents1, parents2, 0.5)
+        self.population.mutate(children, 0.5, crossed)
+        self.assertEqual(children.shape, (40, 3))
+        self.assertTrue(np.all((children >= 0) & (children < [3, 1, 4])))
+        self.assertTrue(np.array_equal(children[:20][~crossed[:20]], parents1[~crossed[:20]]))
+
+    def test_best_and_worst_indices(self):
+        fitness = self.population.fitness
+        self.assertEqual(fitness[self.population.get_best_indices(10)].tolist(), sorted(fitness, reverse=True)[:10])
+        self.assertEqual(sorted(fitness[self.population.get_worst_indices(10)]), sorted(fitness)[:10])
+
+    def test_diversity(self):
+        self.population.genomes[:] = self.population.genomes[0]
+        distinct_ratio, entropy = self.population.get_diversity()
+        self.assertEqual(distinct_ratio, 1 / 50)
+        self.assertEqual(entropy, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Process
+from typing import Optional
 from PyQt6.QtWidgets import QApplication  # needed for qtawesome
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QLineEdit, QTableWidget,
@@ -12,11 +14,46 @@ from utils.launcher import timetable_app_launcher
 from utils.scraper import Scraper
 
 
+class CourseNameResolver(QObject):
+    """Resolves course names concurrently in background threads, results are emitted as signals"""
+    name_resolved = pyqtSignal(str, str, str)  # term, course id, course name
+    name_failed = pyqtSignal(str, str)  # term, course id - name is not known, it is resolved again next time
+
+    def __init__(self, scraper: Scraper):
+        super().__init__()
+        self.scraper: Scraper = scraper
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=scraper.max_in_flight)
+        self.pending: set[tuple[str, str]] = set()
+
+    def resolve(self, term: str, course_id: str) -> None:
+        if (term, course_id) in self.pending:
+            return
+        self.pending.add((term, course_id))
+        self.executor.submit(self._resolve, term, course_id)
+
+    def _resolve(self, term: str, course_id: str) -> None:
+        try:
+            course_name = self.scraper.get_course_name_and_validate(course_id, term)
+        except Exception as error:
+            print(f"Could not get name of course {course_id}: {error}")
+            self.name_failed.emit(term, course_id)
+            return
+        self.name_resolved.emit(term, course_id, course_name)
+
+    def close(self) -> None:
+        """Drops pending lookups, so only the ones already running can delay exit"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
 class ConfigApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config_manager: ConfigManager = ConfigManager()
         self.scraper: Scraper = Scraper()
+        self.course_names: dict[tuple[str, str], str] = {}  # (term, course id) -> course name
+        self.course_name_resolver: CourseNameResolver = CourseNameResolver(self.scraper)
+        self.course_name_resolver.name_resolved.connect(self.set_course_name)
+        self.course_name_resolver.name_failed.connect(self.set_course_name_failed)
         self.setWindowTitle("Timetable Optimizer")
         self.setWindowIcon(qta.icon('fa.cogs'))
         self.setGeometry(100, 100, 1150, 800)
@@ -153,55 +190,86 @@ class ConfigApp(QMainWindow):
         }
         """
 
+    def closeEvent(self, event) -> None:
+        self.course_name_resolver.close()
+        super().closeEvent(event)
+
     def update_course_table(self) -> None:
+        """Fills table with known course names instantly, unknown names are resolved in background"""
         self.course_table.setRowCount(0)
-        courses_name_dict = {course_id: self.scraper.get_course_name_and_validate(course_id) for course_id in self.config_manager.get_all_courses()}
-        courses_name_dict = dict(sorted(courses_name_dict.items(), key=lambda x: x[1]))
-
-
-        for i, course_id in enumerate(courses_name_dict.keys()):
-            self.course_table.insertRow(i)
-            self.course_table.setRowHeight(i, 90)
-            course_item = QTableWidgetItem(course_id)
-            course_item.setFont(QFont('Arial', 16))
-            course_item.setFlags(course_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.course_table.setItem(i, 0, course_item)
-            # if not (course_name := self.scraper.get_course_name_and_validate(course_id)):
-            #     course_name = "Invalid Course"
-            course_name = courses_name_dict[course_id]
-
-            name_item = QTableWidgetItem(course_name)
-            name_item.setFont(QFont('Arial', 16))
-            name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-
-            self.course_table.setItem(i, 1, name_item)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout()
-
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            edit_button = QPushButton("Disable Class Groups")
-
-            edit_button.setIcon(qta.icon('fa.ban', color='white'))
-            edit_button.setObjectName("action_button")
-            edit_button.setFixedSize(240, 30)
-            edit_button.setStyleSheet(self.get_button_stylesheet())
-            edit_button.clicked.connect(lambda _, cid=course_id: self.edit_course_dialog(cid))
-            actions_layout.addWidget(edit_button)
-
-            delete_button = QPushButton("Delete Course")
-            delete_button.setIcon(qta.icon('fa.trash', color='white'))
-            delete_button.setObjectName("action_button")
-            delete_button.setFixedSize(160, 30)
-            delete_button.setStyleSheet(self.get_button_stylesheet())
-            delete_button.clicked.connect(lambda _, cid=course_id: self.delete_course(cid))
-            actions_layout.addWidget(delete_button)
-
-            actions_widget.setLayout(actions_layout)
-            self.course_table.setCellWidget(i, 2, actions_widget)
+        term = self.config_manager.get_term()
+        for course_id in self.config_manager.get_all_courses():
+            if (term, course_id) not in self.course_names:
+                self.course_name_resolver.resolve(term, course_id)
+        # courses with names being resolved are at the end
+        courses_name_dict = {course_id: self.course_names.get((term, course_id))
+                             for course_id in self.config_manager.get_all_courses()}
+        courses_name_dict = dict(sorted(courses_name_dict.items(), key=lambda x: (x[1] is None, x[1] or '')))
+
+        for i, (course_id, course_name) in enumerate(courses_name_dict.items()):
+            self.add_course_row(i, course_id, course_name if course_name is not None else "Loading...")
 
         self.course_table.resizeColumnsToContents()
         self.course_table.setColumnWidth(2, 200)
 
+    def set_course_name(self, term: str, course_id: str, course_name: str) -> None:
+        self.course_name_resolver.pending.discard((term, course_id))
+        self.course_names[(term, course_id)] = course_name
+        if term != self.config_manager.get_term():
+            return
+        if not any(pending_term == term for pending_term, _ in self.course_name_resolver.pending):
+            self.update_course_table()  # all names are known - sort table
+            return
+        for row in range(self.course_table.rowCount()):
+            if self.course_table.item(row, 0).text() == course_id:
+                self.course_table.item(row, 1).setText(course_name)
+                self.course_table.resizeColumnToContents(1)
+
+    def set_course_name_failed(self, term: str, course_id: str) -> None:
+        """Name is not cached, so it is resolved again with the next table update"""
+        self.course_name_resolver.pending.discard((term, course_id))
+        if term != self.config_manager.get_term():
+            return
+        for row in range(self.course_table.rowCount()):
+            if self.course_table.item(row, 0).text() == course_id:
+                self.course_table.item(row, 1).setText('')
+
+    def add_course_row(self, i: int, course_id: str, course_name: str) -> None:
+        self.course_table.insertRow(i)
+        self.course_table.setRowHeight(i, 90)
+        course_item = QTableWidgetItem(course_id)
+        course_item.setFont(QFont('Arial', 16))
+        course_item.setFlags(course_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        self.course_table.setItem(i, 0, course_item)
+
+        name_item = QTableWidgetItem(course_name)
+        name_item.setFont(QFont('Arial', 16))
+        name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
+        self.course_table.setItem(i, 1, name_item)
+        actions_widget = QWidget()
+        actions_layout = QHBoxLayout()
+
+        actions_layout.setContentsMargins(0, 0, 0, 0)
+        edit_button = QPushButton("Disable Class Groups")
+
+        edit_button.setIcon(qta.icon('fa.ban', color='white'))
+        edit_button.setObjectName("action_button")
+        edit_button.setFixedSize(240, 30)
+        edit_button.setStyleSheet(self.get_button_stylesheet())
+        edit_button.clicked.connect(lambda _, cid=course_id: self.edit_course_dialog(cid))
+        actions_layout.addWidget(edit_button)
+
+        delete_button = QPushButton("Delete Course")
+        delete_button.setIcon(qta.icon('fa.trash', color='white'))
+        delete_button.setObjectName("action_button")
+        delete_button.setFixedSize(160, 30)
+        delete_button.setStyleSheet(self.get_button_stylesheet())
+        delete_button.clicked.connect(lambda _, cid=course_id: self.delete_course(cid))
+        actions_layout.addWidget(delete_button)
+
+        actions_widget.setLayout(actions_layout)
+        self.course_table.setCellWidget(i, 2, actions_widget)
 
     def get_button_stylesheet(self) -> str:
         return """
@@ -301,9 +369,22 @@ class AddEditCourseDialog(QDialog):
 
         self.setLayout(self.layout)
 
+        # course id is validated in background, saving finishes when its name is resolved
+        self.pending_course: Optional[tuple[str, str, dict[str, list[int]]]] = None  # term, course id, blacklist
+        self.parent.course_name_resolver.name_resolved.connect(self.finish_save_course)
+        self.parent.course_name_resolver.name_failed.connect(self.cancel_save_course)
+
         if self.course_id:
             self.load_course()
 
+    def done(self, result: int) -> None:
+        try:
+            self.parent.course_name_resolver.name_resolved.disconnect(self.finish_save_course)
+            self.parent.course_name_resolver.name_failed.disconnect(self.cancel_save_course)
+        except TypeError:  # already disconnected, dialog was closed before
+            pass
+        super().done(result)
+
     def get_lineedit_stylesheet(self) -> str:
         return """
         QLineEdit {
@@ -348,24 +429,45 @@ class AddEditCourseDialog(QDialog):
             QMessageBox.warning(self, "Error", "Course ID cannot be empty")
             return
 
-        if not (course_name := self.get_course_name_and_validate(course_id)):
-            QMessageBox.warning(self, "Error", "Course ID is invalid")
-            return
-
         try:
             blacklisted_groups = {class_type: list(map(int, bad_groups.text().split(','))) if bad_groups.text() else []
                                   for class_type, bad_groups in self.blacklisted_groups.items()}
         except ValueError:
             QMessageBox.warning(self, "Error", "Blacklisted groups must be a list of integers")
             return
+
+        term = self.parent.config_manager.get_term()
+        self.pending_course = (term, course_id, blacklisted_groups)
+        if (term, course_id) in self.parent.course_names:
+            self.finish_save_course(term, course_id, self.parent.course_names[(term, course_id)])
+            return
+        self.set_validating(True)
+        self.parent.course_name_resolver.resolve(term, course_id)
+
+    def set_validating(self, validating: bool) -> None:
+        self.save_button.setDisabled(validating)
+        self.save_button.setText("Validating..." if validating else "Save")
+
+    def finish_save_course(self, term: str, course_id: str, course_name: str) -> None:
+        if self.pending_course is None or self.pending_course[:2] != (term, course_id):
+            return
+        _, _, blacklisted_groups = self.pending_course
+        self.pending_course = None
+        self.set_validating(False)
+        if not course_name:
+            QMessageBox.warning(self, "Error", "Course ID is invalid")
+            return
         self.course_id = course_id
         self.parent.config_manager.set_blacklisted_groups_for_course_and_add_course(course_id, blacklisted_groups)
         self.parent.update_course_table()
         self.accept()
 
-    def get_course_name_and_validate(self, course_id) -> str:
-        course_id = course_id.upper()
-        return self.parent.scraper.get_course_name_and_validate(course_id)
+    def cancel_save_course(self, term: str, course_id: str) -> None:
+        if self.pending_course is None or self.pending_course[:2] != (term, course_id):
+            return
+        self.pending_course = None
+        self.set_validating(False)
+        QMessageBox.warning(self, "Error", "Could not validate course ID, check your connection and try again")
 
 
 class TravelTimeManagerDialog(QDialog):
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class FitnessCache:
+    """
+    In-memory cache of solution fitness bounded by number of entries.
+    Policies: 'lru' evicts least recently used entry, 'lfu' evicts least frequently used entry
+    (least recently used one among entries with the same frequency).
+    """
+    policies: tuple[str, ...] = ('lru', 'lfu')
+
+    def __init__(self, max_entries: int = 200_000, policy: str = 'lru'):
+        if policy not in self.policies:
+            raise ValueError(f"Unknown cache policy {policy}, expected one of {', '.join(self.policies)}")
+        if max_entries < 1:
+            raise ValueError("Cache has to hold at least one entry")
+        self.max_entries: int = max_entries
+        self.policy: str = policy
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()  # in order of use for lru
+        # lfu only - key -> number of uses, number of uses -> keys in order of use
+        self._frequencies: dict[Hashable, int] = {}
+        self._frequency_keys: dict[int, OrderedDict[Hashable, None]] = {}
+        self._min_frequency: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[float]:
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._use(key)
+        return fitness
+
+    def put(self, key: Hashable, fitness: float) -> None:
+        if key in self._entries:
+            self._entries[key] = fitness
+            self._use(key)
+            return
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = fitness
+        if self.policy == 'lfu':
+            self._frequencies[key] = 1
+            self._frequency_keys.setdefault(1, OrderedDict())[key] = None
+            self._min_frequency = 1
+
+    def _use(self, key: Hashable) -> None:
+        if self.policy == 'lru':
+            self._entries.move_to_end(key)
+            return
+        frequency = self._frequencies[key]
+        keys = self._frequency_keys[frequency]
+        del keys[key]
+        if not keys:
+            del self._frequency_keys[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        self._frequencies[key] = frequency + 1
+        self._frequency_keys.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _evict(self) -> None:
+        if self.policy == 'lru':
+            self._entries.popitem(last=False)
+        else:
+            keys = self._frequency_keys[self._min_frequency]
+            key, _ = keys.popitem(last=False)
+            if not keys:
+                del self._frequency_keys[self._min_frequency]
+            del self._frequencies[key]
+            del self._entries[key]
+        self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all entries, statistics are kept"""
+        self._entries.clear()
+        self._frequencies.clear()
+        self._frequency_keys.clear()
+        self._min_frequency = 0
+
+    def get_hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def get_stats_summary(self) -> str:
+        return (f"{len(self)}/{self.max_entries} entries ({self.policy}), {self.hits} hits, {self.misses} misses, "
+                f"{self.evictions} evictions, hit rate {self.get_hit_rate():.1%}")
@@ -1,29 +1,44 @@
 import sys
+from typing import Optional
 
-from PyQt6.QtWidgets import QApplication
+from PyQt6.QtWidgets import QApplication, QMessageBox
 from pytictoc import TicToc
 
-from optimizers.ga_optimizer import GAOptimizer
+from models.timetable import TimeTable
+from optimizers.auto_optimizer import create_optimizer
+from optimizers.base_optimizer import BaseOptimizer
 from ui.timetable_ui import TimetableApp
 
 
+def find_timetable(optimizer: BaseOptimizer) -> Optional[TimeTable]:
+    """Runs optimizer and saves its plan, returns None if no solution was found within its budget"""
+    optimizer.run()
+    if not optimizer.best_solution:
+        print("No timetable found")
+        return None
+    final_timetable = optimizer.get_timetable_from_best_solution()
+    best_solution_dict = optimizer.get_best_solution_as_dict()
+
+    print(final_timetable.to_str_full())
+    final_timetable.save_plan(best_solution_dict)
+    return final_timetable
+
+
 def timetable_app_launcher(window_id: int):
     ptt = TicToc()
     ptt.tic()
-    ga = GAOptimizer(population_size=2800, mutation_probability=0.015, crossover_probability=0.6, generations=90,
-                     elite_percentage=5)
-    ga.run()
-    final_timetable = ga.get_timetable_from_best_solution()
-    best_solution_dict = ga.get_best_solution_as_dict()
+    # UI promises the plan in less than 30 seconds
+    optimizer = create_optimizer(population_size=2800, mutation_probability=0.015, crossover_probability=0.6,
+                                 generations=90, elite_percentage=5, time_limit=25)
+    final_timetable = find_timetable(optimizer)
 
     ptt.toc("Time elapsed for algorithm")
 
-    print(final_timetable.to_str_full())
-    final_timetable.save_plan(best_solution_dict)
-
-
     app = QApplication(sys.argv + ['-platform', 'windows:darkmode=0'])
-    window = TimetableApp(final_timetable, ga.best_fitness, window_id)
+    if final_timetable is None:
+        QMessageBox.warning(None, "Create Plan", "No plan was found in time")
+        sys.exit(1)
+    window = TimetableApp(final_timetable, optimizer.best_fitness, window_id)
     window.show()
     window.activate_main_window()
     sys.exit(app.exec())
@@ -0,0 +1,11 @@
+import os
+
+
+def get_base_directory() -> str:
+    """Returns root directory of the project"""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_cache_directory(name: str) -> str:
+    """Returns directory of given cache in .cache of the project root"""
+    return os.path.join(get_base_directory(), '.cache', name)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from utils.paths import get_cache_directory
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of USOS API responses.
+    Every response is stored as a separate json file named after the hash of its key,
+    file modification time is used as the last access time for LRU eviction.
+    """
+    default_ttls: dict[str, int] = {  # seconds
+        'terms/terms_index': 24 * 60 * 60,
+        'courses/course_edition': 24 * 60 * 60,
+        'courses/course_editions': 24 * 60 * 60,
+        'courses/course_unit': 24 * 60 * 60,
+        'courses/units': 24 * 60 * 60,
+        'courses/classtypes_index': 7 * 24 * 60 * 60,
+        'tt/classgroup_dates2': 6 * 60 * 60,
+    }
+    default_ttl: int = 60 * 60
+
+    def __init__(self, directory: str = None, ttls: dict[str, int] = None, max_size: int = 64 * 1024 * 1024):
+        self.directory: str = directory or get_cache_directory('usos')
+        self.ttls: dict[str, int] = {**self.default_ttls, **(ttls or {})}
+        self.max_size: int = max_size  # bytes
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, float]] = {}  # file name -> (size, last access time)
+        os.makedirs(self.directory, exist_ok=True)
+        self.load_index()
+
+    def load_index(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                self._index[entry.name] = (stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict, term_id: str) -> str:
+        raw_key = json.dumps([endpoint, sorted((str(k), str(v)) for k, v in params.items()), term_id])
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns stored entry (even if expired) or None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self._touch(key)
+        return entry
+
+    def is_fresh(self, endpoint: str, entry: dict) -> bool:
+        return time.time() - entry['stored_at'] < self.ttls.get(endpoint, self.default_ttl)
+
+    @staticmethod
+    def get_revalidation_headers(entry: Optional[dict]) -> dict[str, str]:
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, key: str, body, etag: str = None, last_modified: str = None) -> None:
+        entry = dict(stored_at=time.time(), etag=etag, last_modified=last_modified, body=body)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # thread idents repeat across processes
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, ensure_ascii=False)
+        os.replace(temp_path, path)  # atomic, so concurrent readers never see half-written file
+        with self._lock:
+            self._index[os.path.basename(path)] = (os.path.getsize(path), time.time())
+        self.evict()
+
+    def refresh(self, key: str, entry: dict) -> None:
+        """Marks entry as fresh again after server confirmed it has not changed"""
+        self.put(key, entry['body'], entry.get('etag'), entry.get('last_modified'))
+
+    def _touch(self, key: str) -> None:
+        name = f"{key}.json"
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if name in self._index:
+                self._index[name] = (self._index[name][0], time.time())
+
+    def get_size(self) -> int:
+        with self._lock:
+            return sum(size for size, _ in self._index.values())
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in max_size"""
+        with self._lock:
+            total_size = sum(size for size, _ in self._index.values())
+            if total_size <= self.max_size:
+                return
+            for name, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                del self._index[name]
+                total_size -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in self._index:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+            self._index = {}
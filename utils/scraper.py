@@ -1,65 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 from config.config_manager import ConfigManager
 from models.course import Course
+from utils.response_cache import ResponseCache
+from utils.transport import Transport
 
 
 class Scraper:
 
-    def __init__(self, ):
+    batch_size: int = 50  # max number of ids in one multi-id USOS API request
+    # only fields that are actually used, to keep responses small
+    course_edition_fields: str = 'course_id|course_name|lecturers|course_units_ids'
+    unit_fields: str = 'id|classtype_id|class_groups'
+    meeting_fields: str = 'start_time|end_time|classtype_name|lecturer_ids'
+
+    def __init__(self, max_in_flight: int = 8, cache: ResponseCache = None):
         self.base_url = 'https://apps.usos.pwr.edu.pl/services'
-        self._session = requests.Session()
         self.config = ConfigManager()
+        self.max_in_flight: int = max_in_flight  # max number of concurrent requests to USOS API
+        self.transport: Transport = Transport(self.base_url, pool_size=max_in_flight)
+        self.cache: ResponseCache = cache or ResponseCache()
+
+    def _get_json(self, endpoint: str, params: dict, term: str = None) -> any:
+        """Returns response from cache if it is fresh, otherwise revalidates or downloads it"""
+        key = self.cache.make_key(endpoint, params, term or self.config.get_term())
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(endpoint, entry):
+            return entry['body']
+
+        response = self.transport.get(endpoint, params, headers=self.cache.get_revalidation_headers(entry))
+        if entry is not None and response.status_code == 304:  # not modified
+            self.cache.refresh(key, entry)
+            return entry['body']
+        body = response.json()
+        if response.ok:
+            self.cache.put(key, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
+
+    def _get_batch_response(self, endpoint: str, params: dict) -> any:
+        """Downloads multi-id response (not cached as a whole), None if the request failed"""
+        try:
+            response = self.transport.get(endpoint, params)
+            return response.json() if response.ok else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _get_json_batch(self, executor: ThreadPoolExecutor, endpoint: str, ids_param: str, ids: list,
+                        params: dict, get_single) -> dict[str, any]:
+        """
+        Fetches objects for many ids using multi-id variant of endpoint (ids separated with '|').
+        Objects are cached per id, so only ids without fresh cache entry are downloaded.
+        Ids missing from the response (or whole batch if the request failed) are fetched one by one.
+        """
+        term = self.config.get_term()
+        unique_ids = list(dict.fromkeys(str(object_id) for object_id in ids))
+        keys = {object_id: self.cache.make_key(endpoint, {ids_param: object_id, **params}, term)
+                for object_id in unique_ids}
+        results = {}
+        for object_id, key in keys.items():
+            entry = self.cache.get(key)
+            if entry is not None and self.cache.is_fresh(endpoint, entry):
+                results[object_id] = entry['body']
+        fetched_ids = [object_id for object_id in unique_ids if object_id not in results]
+        batches = [fetched_ids[i:i + self.batch_size] for i in range(0, len(fetched_ids), self.batch_size)]
+        for batch, response in zip(batches, executor.map(
+                lambda batch: self._get_batch_response(endpoint, {ids_param: '|'.join(batch), **params}), batches)):
+            if isinstance(response, dict):
+                for object_id in batch:
+                    if response.get(object_id):
+                        results[object_id] = response[object_id]
+                        self.cache.put(keys[object_id], response[object_id])
+        missing_ids = [object_id for object_id in unique_ids if object_id not in results]
+        results.update(zip(missing_ids, executor.map(get_single, missing_ids)))
+        return results
 
     def get_valid_semesters(self) -> [dict[str, str]]:
 
         params = dict(term_type='semester', active_only='true')
-        response = self._session.get(f'{self.base_url}/terms/terms_index', params=params, timeout=15)
-        return {term['id']: term['name']['en'] for term in response.json()}
+        return {term['id']: term['name']['en'] for term in self._get_json('terms/terms_index', params)}
 
     @staticmethod
-    def _get_lecturer_name(lecturer_id: int, lecturers_dict: dict) -> str:
-        for lecturer_info in lecturers_dict:
-            if lecturer_info['id'] == str(lecturer_id):
-                return f"{lecturer_info['first_name']} {lecturer_info['last_name']}"
-        else:
-            return "Unknown"
-
-    def get_course_name_and_validate(self, course_id: str) -> str:
-        params = dict(course_id=course_id, term_id=self.config.get_term(),
-                      fields='course_id|course_name')
-        response = self._session.get(f'{self.base_url}/courses/course_edition', params=params, timeout=15)
-        if response.json().get('course_id') == course_id.upper():
-            return response.json()['course_name']['pl']
+    def _get_lecturer_names(lecturers: list[dict]) -> dict[str, str]:
+        """Returns lecturer names by lecturer id"""
+        return {lecturer_info['id']: f"{lecturer_info['first_name']} {lecturer_info['last_name']}"
+                for lecturer_info in lecturers}
+
+    def get_course_name_and_validate(self, course_id: str, term: str = None) -> str:
+        term = term or self.config.get_term()
+        params = dict(course_id=course_id, term_id=term, fields='course_id|course_name')
+        course_edition = self._get_json('courses/course_edition', params, term)
+        if course_edition.get('course_id') == course_id.upper():
+            return course_edition['course_name']['pl']
         else:
             return ''
 
     def get_course_info(self, course_id: str) -> list[Course]:
+        return self.get_courses_info([course_id])
+
+    def get_courses_info(self, course_ids: list[str]) -> list[Course]:
+        """
+        Fetches all given courses with at most max_in_flight concurrent requests.
+        Requests are sent in three stages (batched course editions, batched units, group meetings),
+        courses are returned in the same order as fetching them one by one would.
+        Meetings of blacklisted groups are not downloaded at all - class type is resolved from the unit.
+        Request statistics of the transport (errors, retries, latency) are printed after downloading.
+        """
+        blacklists = {course_id: self.config.get_blacklisted_groups_for_course(course_id) or {}
+                      for course_id in course_ids}
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            editions = self._get_json_batch(executor, 'courses/course_editions', 'course_ids', course_ids,
+                                            dict(term_id=self.config.get_term(), fields=self.course_edition_fields),
+                                            self.get_course_edition)
+            editions = {course_id: editions[str(course_id)] for course_id in course_ids}
+
+            unit_ids = [unit_id for course_id in course_ids for unit_id in editions[course_id]['course_units_ids']]
+            units = self._get_json_batch(executor, 'courses/units', 'unit_ids', unit_ids,
+                                         dict(fields=self.unit_fields), self.get_unit)
+            units_groups = {unit_id: self._get_group_numbers(units[str(unit_id)]) for unit_id in unit_ids}
+
+            for course_id in course_ids:
+                for unit_id in editions[course_id]['course_units_ids']:
+                    if not units_groups[unit_id]:
+                        raise ValueError(f"Course {course_id} {editions[course_id]['course_name']['pl']} has no groups"
+                                         f" - check if it takes place in selected term.")
+
+            class_types = self.get_class_types() if any(any(blacklist.values()) for blacklist in blacklists.values()) \
+                else {}
+            units_types = {unit_id: class_types.get(str(units[str(unit_id)].get('classtype_id')))
+                           for unit_id in unit_ids}
+            skipped_groups = {(unit_id, group) for course_id in course_ids
+                              for unit_id in editions[course_id]['course_units_ids']
+                              for group in blacklists[course_id].get(units_types[unit_id], [])}
+            # int() - fix for usos api being retarded and returning group number as float
+            group_requests = [(unit_id, int(group)) for unit_id in unit_ids for group in units_groups[unit_id]
+                              if (unit_id, int(group)) not in skipped_groups]
+            groups_info = dict(zip(group_requests,
+                                   executor.map(lambda request: self.get_group_meetings_and_info(*request),
+                                                group_requests)))
+        if stats_summary := self.transport.get_stats_summary():
+            print("USOS API requests of this session:")
+            print(stats_summary)
+
         course_list = []
-        params = dict(course_id=course_id, term_id=self.config.get_term(),
-                      fields='course_id|course_name|term_id|homepage_url|profile_url|coordinators|lecturers|course_units_ids')
-        response = self._session.get(f'{self.base_url}/courses/course_edition', params=params, timeout=15)
-        course_unit_ids = response.json()['course_units_ids']
-        name = response.json()['course_name']['pl']
-        lecturers = response.json()['lecturers']
-        for unit_id in course_unit_ids:
-            course = Course(course_id, name, course_unit_id=unit_id)
-            groups = self.get_groups(unit_id)
-            if not groups:
-                raise ValueError(
-                    f"Course {course_id} {course.name} has no groups - check if it takes place in selected term.")
-            for group in groups:
-                group = int(group)  # fix for usos api being retarded and returning group number as float
-                meetings, class_type, lecturer_id = self.get_group_meetings_and_info(unit_id, group)
-                if not meetings:
-                    continue
-                lecturer_name = self._get_lecturer_name(lecturer_id, lecturers)
-                course.update_type(class_type)
-                course.add_group(group, meetings, lecturer_name, class_type)
-            course_list.append(course)
-        self.blacklist_groups_from_config(course_list)
+        for course_id in course_ids:
+            name = editions[course_id]['course_name']['pl']
+            lecturer_names = self._get_lecturer_names(editions[course_id]['lecturers'])
+            for unit_id in editions[course_id]['course_units_ids']:
+                course = Course(course_id, name, course_unit_id=unit_id)
+                for group in units_groups[unit_id]:
+                    group = int(group)
+                    if (unit_id, group) in skipped_groups:
+                        continue
+                    meetings, class_type, lecturer_id = groups_info[(unit_id, group)]
+                    if not meetings:
+                        continue
+                    lecturer_name = lecturer_names.get(str(lecturer_id), "Unknown")
+                    course.update_type(class_type)
+                    course.add_group(group, meetings, lecturer_name, class_type)
+                if course.groups and course.type != units_types[unit_id]:
+                    # class type of unit was unknown (or different) before download
+                    self.blacklist_groups_from_config([course])
+                course_list.append(course)
         return course_list
 
+    def get_class_types(self) -> dict[str, str]:
+        """Returns english class type names by class type id"""
+        class_types = self._get_json('courses/classtypes_index', {})
+        return {class_type_id: class_type['name']['en'] for class_type_id, class_type in class_types.items()}
+
+    def get_course_edition(self, course_id: str) -> dict:
+        params = dict(course_id=course_id, term_id=self.config.get_term(), fields=self.course_edition_fields)
+        return self._get_json('courses/course_edition', params)
+
     def blacklist_groups_from_config(self, courses: list[Course]) -> None:
         for course in courses:
             blacklisted_groups = self.config.get_blacklisted_groups(course.raw_id, course.type)
@@ -69,21 +183,26 @@ class Scraper:
             # print(course)
 
     def get_groups(self, course_unit_id: int) -> list[int]:
-        #  https://apps.usos.pwr.edu.pl/services/courses/course_unit?course_unit_id=62142&fields=id|homepage_url|profile_url|class_groups"
-        params = dict(course_unit_id=course_unit_id, fields='id|homepage_url|profile_url|class_groups')
-        response = self._session.get(f'{self.base_url}/courses/course_unit', params=params, timeout=15)
-        return [group['number'] for group in response.json()['class_groups']]
+        return self._get_group_numbers(self.get_unit(course_unit_id))
+
+    def get_unit(self, course_unit_id: int) -> dict:
+        #  https://apps.usos.pwr.edu.pl/services/courses/course_unit?course_unit_id=62142&fields=id|classtype_id|class_groups"
+        params = dict(course_unit_id=course_unit_id, fields=self.unit_fields)
+        return self._get_json('courses/course_unit', params)
+
+    @staticmethod
+    def _get_group_numbers(unit: dict) -> list[int]:
+        return [group['number'] for group in unit['class_groups']]
 
     def get_group_meetings_and_info(self, unit_id: int, group_id: int) -> tuple[list[dict[str, str]], str, int]:
-        params = dict(unit_id=unit_id, group_number=group_id,
-                      fields='type|start_time|end_time|name|url|course_id|course_name|classtype_name|lecturer_ids|group_number|classgroup_profile_url|building_name|building_id|room_number|room_id|unit_id|classtype_id|cgwm_id|frequency|sm_id')
-        response = self._session.get(f'{self.base_url}/tt/classgroup_dates2', params=params, timeout=15)
-        if not response.json():  # group has no meetings
+        params = dict(unit_id=unit_id, group_number=group_id, fields=self.meeting_fields)
+        meetings = self._get_json('tt/classgroup_dates2', params)
+        if not meetings:  # group has no meetings
             return [], "", 0
-        class_type = response.json()[0]['classtype_name']['en']
-        if lecturers_ids := response.json()[0]['lecturer_ids']:
+        class_type = meetings[0]['classtype_name']['en']
+        if lecturers_ids := meetings[0]['lecturer_ids']:
             lecturer_id = lecturers_ids[0]
         else:
             lecturer_id = -1
         return [{"start_time": meeting['start_time'], 'end_time': meeting['end_time']} for meeting in
-                response.json()], class_type, lecturer_id
+                meetings], class_type, lecturer_id
@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TokenBucket:
+    """Thread-safe client-side rate limiter, allows short bursts up to capacity"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate: float = rate  # tokens per second
+        self.capacity: int = capacity
+        self.tokens: float = capacity
+        self.last_refill: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self.total_latency: float = 0
+        self.max_latency: float = 0
+
+    def add_request(self, latency: float) -> None:
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def get_average_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0
+
+    def __str__(self) -> str:
+        return (f"{self.requests} requests, {self.errors} errors, {self.retries} retries, "
+                f"avg {self.get_average_latency() * 1000:.0f} ms, max {self.max_latency * 1000:.0f} ms")
+
+
+class Transport:
+    """
+    HTTP transport for USOS API: pooled connections, client-side rate limiting
+    and retries with jittered exponential backoff for timeouts, connection errors and 429/5xx responses.
+    """
+    retry_status_codes: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, base_url: str, pool_size: int = 8, requests_per_second: float = 20, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 8, timeout: float = 15):
+        self.base_url: str = base_url
+        self.max_retries: int = max_retries
+        self.backoff_base: float = backoff_base  # seconds
+        self.backoff_max: float = backoff_max  # seconds
+        self.timeout: float = timeout  # seconds
+        self.rate_limiter: TokenBucket = TokenBucket(requests_per_second, capacity=pool_size)
+        self.stats: dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def get_backoff_time(self, attempt: int) -> float:
+        """Full jitter - random time between 0 and exponentially growing limit"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _get_endpoint_stats(self, endpoint: str) -> EndpointStats:
+        with self._stats_lock:
+            if endpoint not in self.stats:
+                self.stats[endpoint] = EndpointStats()
+            return self.stats[endpoint]
+
+    def get(self, endpoint: str, params: dict, headers: dict = None) -> requests.Response:
+        stats = self._get_endpoint_stats(endpoint)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            start_time = time.perf_counter()
+            try:
+                response = self._session.get(f'{self.base_url}/{endpoint}', params=params, headers=headers,
+                                             timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                with self._stats_lock:
+                    stats.add_request(time.perf_counter() - start_time)
+                    stats.errors += 1
+                if attempt == self.max_retries:
+                    raise
+            else:
+                with self._stats_lock:
+                    stats.add_request(time.perf_counter() - start_time)
+                    if response.status_code >= 400:
+                        stats.errors += 1
+                if response.status_code not in self.retry_status_codes or attempt == self.max_retries:
+                    return response
+            with self._stats_lock:
+                stats.retries += 1
+            time.sleep(self.get_backoff_time(attempt))
+
+    def get_stats_summary(self) -> str:
+        with self._stats_lock:
+            return "\n".join(f"{endpoint}: {stats}" for endpoint, stats in sorted(self.stats.items()))